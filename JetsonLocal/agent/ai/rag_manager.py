@@ -1,10 +1,42 @@
 import os
 import asyncio
 import shutil
-import requests
+from typing import List
 from pypdf import PdfReader
 from core.config import STORAGE_DIR, LOCAL_DB_NAME, DEFAULT_MODEL, EMBEDDING_MODEL
-from ai.lightrag_local import LightRAG
+from ai.lightrag_local import LightRAG, _tokenizer
+
+# Same windows and env knobs as the website's database_api._chunk_text:
+# CHUNK_TOKENS-token windows every CHUNK_STRIDE tokens, or character windows
+# when AURA_CHUNK_MODE=chars or tiktoken is unavailable
+CHUNK_MODE = (os.getenv("AURA_CHUNK_MODE", "tokens") or "tokens").strip().lower()
+CHUNK_TOKENS = max(16, int(os.getenv("AURA_CHUNK_TOKENS", "512")))
+CHUNK_STRIDE = int(os.getenv("AURA_CHUNK_STRIDE", "0")) or int(0.75 * CHUNK_TOKENS)
+CHUNK_STRIDE = max(1, min(CHUNK_TOKENS, CHUNK_STRIDE))
+CHUNK_CHARS = 2400
+CHUNK_OVERLAP = 250
+
+def _chunk_text(text: str) -> List[str]:
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = text.strip()
+    if not text:
+        return []
+    enc = _tokenizer() if CHUNK_MODE == "tokens" else None
+    if enc is not None:
+        toks = enc.encode(text, disallowed_special=())
+        if len(toks) <= CHUNK_TOKENS:
+            return [text]
+        last = len(toks) - CHUNK_TOKENS
+        chunks = [
+            enc.decode(toks[i:i + CHUNK_TOKENS]).strip()
+            for i in range(0, last + CHUNK_STRIDE, CHUNK_STRIDE)
+        ]
+        return [c for c in chunks if c]
+    stride = CHUNK_CHARS - CHUNK_OVERLAP
+    last = max(0, len(text) - CHUNK_CHARS)
+    chunks = [text[i:i + CHUNK_CHARS].strip() for i in range(0, last + stride, stride)]
+    return [c for c in chunks if c]
 
 class RagManager:
     def __init__(self):
@@ -27,6 +59,13 @@ class RagManager:
             print(f"[RAG] Init failed: {e}")
             return False
 
+    def _download(self, session, url: str, dest: str) -> None:
+        with session.get(url, stream=True, timeout=120.0) as response:
+            response.raise_for_status()
+            with open(dest, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+
     def extract_text(self, path: str) -> str:
         try:
             reader = PdfReader(path)
@@ -40,13 +79,17 @@ class RagManager:
         if not self.rag_system: return False
         
         local_pdf = os.path.join(self.db_path, "temp.pdf")
-        response = requests.get(pdf_url, stream=True)
-        with open(local_pdf, 'wb') as f: shutil.copyfileobj(response.raw, f)
+        # Reuse the client's pooled keep-alive session, off the event loop
+        await asyncio.to_thread(self._download, api_client.session, pdf_url, local_pdf)
             
-        text = self.extract_text(local_pdf)
+        text = await asyncio.to_thread(self.extract_text, local_pdf)
         if text:
-            # 1. Insert into local graph/vector DB
-            await asyncio.to_thread(self.rag_system.insert, text)
+            # 1. Insert into local graph/vector DB: all chunks go through one
+            #    ainsert_many (batched /api/embed calls, one store append)
+            source = os.path.basename(pdf_url.split("?", 1)[0]) or "document.pdf"
+            chunks = _chunk_text(f"[SOURCE FILE: {source}]\n\n{text}")
+            await self.rag_system.ainsert_many(chunks, [{"source": source} for _ in chunks])
+            await asyncio.to_thread(self.rag_system.flush)
             
             # 2. Upload raw files to Website Repository
             try:
@@ -1,16 +1,77 @@
 import requests
-from typing import Any, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, Iterator, List, Tuple
 import os
+import uuid
 
 from core.config import API_BASE_URL, DEVICE_SHARED_SECRET
 
 
+VECTOR_DB_FILES = ["faiss.index", "embeddings.npy", "meta.json", "db.json"]
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _build_session() -> requests.Session:
+    # One pooled keep-alive session for every backend call; idempotent requests
+    # (GET/HEAD) are retried on gateway errors, POST bodies are never replayed.
+    # Once retries run out the last response is returned, not raised, so callers
+    # that branch on status_code still see it.
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+class _MultipartFileStream:
+    """multipart/form-data body that reads files lazily; __len__ lets requests send Content-Length."""
+
+    def __init__(self, field: str, paths: List[Tuple[str, str]]):
+        self.boundary = uuid.uuid4().hex
+        self._parts = []
+        total = 0
+        for fn, path in paths:
+            head = (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field}"; filename="{fn}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode("utf-8")
+            size = os.path.getsize(path)
+            self._parts.append((head, path, size))
+            total += len(head) + size + 2
+        self._tail = f"--{self.boundary}--\r\n".encode("utf-8")
+        self._len = total + len(self._tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[bytes]:
+        for head, path, _ in self._parts:
+            yield head
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            yield b"\r\n"
+        yield self._tail
+
+
 class ApiClient:
     def __init__(self):
         self.base_url = API_BASE_URL.rstrip("/")
         self.timeout = 15
         self.camera_timeout = 4
-        self.session = requests.Session()
+        self.session = _build_session()
+        # device_id -> (etag, config) from the last 200 on /device/config
+        self._config_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
 
     def download_document(self, path: str, dest_path: str):
         r = self.session.get(
@@ -29,34 +90,26 @@ class ApiClient:
     def upload_vector_db(self, db_name: str, db_dir: str):
         """Uploads individual LightRAG files to the website backend."""
         url = f"{self.base_url}/api/databases/{db_name}/sync_up"
-        headers = {"X-Device-Secret": self.secret}
-        
-        files_to_send = []
-        file_handles = []
-        allowed_files = ["faiss.index", "embeddings.npy", "meta.json", "db.json"]
-        
-        for fn in allowed_files:
+
+        # Stream the files from disk instead of letting requests build the whole body in memory
+        paths = []
+        for fn in VECTOR_DB_FILES:
             path = os.path.join(db_dir, fn)
             if os.path.exists(path):
-                f = open(path, "rb")
-                file_handles.append(f)
-                files_to_send.append(("files", (fn, f, "application/octet-stream")))
+                paths.append((fn, path))
 
-        try:
-            response = self.session.post(url, headers=headers, files=files_to_send, timeout=120.0)
-            response.raise_for_status()
-            return response.json()
-        finally:
-            for f in file_handles:
-                f.close()
+        body = _MultipartFileStream("files", paths)
+        headers = {"X-Device-Secret": DEVICE_SHARED_SECRET, "Content-Type": body.content_type}
+        response = self.session.post(url, headers=headers, data=body, timeout=120.0)
+        response.raise_for_status()
+        return response.json()
 
     def download_vector_db(self, db_name: str, dest_dir: str):
         """Downloads individual LightRAG files from the website backend."""
-        headers = {"X-Device-Secret": self.secret}
-        allowed_files = ["faiss.index", "embeddings.npy", "meta.json", "db.json"]
+        headers = {"X-Device-Secret": DEVICE_SHARED_SECRET}
         os.makedirs(dest_dir, exist_ok=True)
         
-        for fn in allowed_files:
+        for fn in VECTOR_DB_FILES:
             url = f"{self.base_url}/api/databases/{db_name}/sync_down/{fn}"
             response = self.session.get(url, headers=headers, stream=True, timeout=120.0)
             if response.status_code == 200:
@@ -146,14 +199,24 @@ class ApiClient:
         return r.json()
 
     def get_config(self, device_id: str) -> Dict[str, Any]:
+        headers = {"X-Device-Secret": DEVICE_SHARED_SECRET}
+        cached = self._config_cache.get(device_id)
+        if cached:
+            headers["If-None-Match"] = cached[0]
         r = self.session.get(
             self._url("/device/config"),
             params={"device_id": device_id},
-            headers={"X-Device-Secret": DEVICE_SHARED_SECRET},
+            headers=headers,
             timeout=self.timeout,
         )
+        if r.status_code == 304 and cached:
+            return cached[1]
         r.raise_for_status()
-        return r.json()
+        data = r.json()
+        etag = r.headers.get("ETag")
+        if etag:
+            self._config_cache[device_id] = (etag, data)
+        return data
 
     def get_next_command(self, device_id: str) -> Dict[str, Any]:
         r = self.session.get(
@@ -2,7 +2,7 @@ import socket
 import time
 import shutil
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Tuple
 
 try:
     import psutil
@@ -17,6 +17,31 @@ except Exception:
 
 START_TIME = time.time()
 
+# Status is pushed every couple of seconds; probes that are slow (jtop opens a
+# service connection, local IP needs a socket) or barely change are reused
+# for a short TTL instead of re-run on every payload.
+SLOW_PROBE_TTL_S = 30.0
+GPU_PROBE_TTL_S = 5.0
+
+_PROBE_CACHE: Dict[str, Tuple[float, Any]] = {}
+
+
+def _cached(key: str, ttl_s: float, probe: Callable[[], Any]) -> Any:
+    now = time.monotonic()
+    hit = _PROBE_CACHE.get(key)
+    if hit is not None and now - hit[0] < ttl_s:
+        return hit[1]
+    value = probe()
+    _PROBE_CACHE[key] = (now, value)
+    return value
+
+if psutil:
+    try:
+        # Prime the counters so cpu_percent(interval=None) measures since the last call
+        psutil.cpu_percent(interval=None)
+    except Exception:
+        pass
+
 
 def get_hostname() -> str:
     return socket.gethostname()
@@ -60,7 +85,7 @@ def get_temperature_c() -> float | None:
 def get_cpu_percent() -> float | None:
     if psutil:
         try:
-            return round(psutil.cpu_percent(interval=0.2), 1)
+            return round(psutil.cpu_percent(interval=None), 1)
         except Exception:
             return None
     return None
@@ -151,12 +176,12 @@ def get_disk_percent() -> float | None:
 
 def collect_device_info() -> Dict[str, Any]:
     return {
-        "hostname": get_hostname(),
-        "local_ip": get_local_ip(),
+        "hostname": _cached("hostname", SLOW_PROBE_TTL_S, get_hostname),
+        "local_ip": _cached("local_ip", SLOW_PROBE_TTL_S, get_local_ip),
         "uptime_seconds": get_uptime_seconds(),
         "cpu_percent": get_cpu_percent(),
-        "gpu_percent": get_gpu_percent(),
+        "gpu_percent": _cached("gpu_percent", GPU_PROBE_TTL_S, get_gpu_percent),
         "ram_percent": get_ram_percent(),
-        "disk_percent": get_disk_percent(),
+        "disk_percent": _cached("disk_percent", SLOW_PROBE_TTL_S, get_disk_percent),
         "temperature_c": get_temperature_c(),
     }
\ No newline at end of file
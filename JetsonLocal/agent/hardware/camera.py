@@ -23,9 +23,42 @@ try:
 except Exception:
     YOLO = None
 
+# libjpeg-turbo's SIMD encoder is 2-4x faster than cv2.imencode for the MJPEG
+# stream; needs the system libturbojpeg, otherwise cv2 is used
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_420
+
+    _TJ = TurboJPEG()
+except Exception:
+    _TJ = None
+
+try:
+    import torch
+
+    torch.backends.cudnn.benchmark = True
+except Exception:
+    torch = None
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-MODEL_PATH = BASE_DIR / "models" / "component_best.pt"
+MODELS_DIR = BASE_DIR / "models"
+
+# Exported TensorRT / ONNX builds run much faster than eager FP32 weights, e.g.
+#   YOLO("component_best.pt").export(format="engine", half=True, imgsz=640)
+# or, with a calibration dataset, INT8:
+#   YOLO("component_best.pt").export(format="engine", int8=True, data="data.yaml", imgsz=640)
+MODEL_SUFFIX_PREFERENCE = (".engine", ".onnx", ".pt")
+
+
+def _resolve_model_path(stem: str) -> Path:
+    for suffix in MODEL_SUFFIX_PREFERENCE:
+        candidate = MODELS_DIR / f"{stem}{suffix}"
+        if candidate.exists():
+            return candidate
+    return MODELS_DIR / f"{stem}.pt"
+
+
+MODEL_PATH = _resolve_model_path("component_best")
 
 
 class CameraService:
@@ -49,6 +82,12 @@ class CameraService:
         self.latest_annotated_jpeg: Optional[bytes] = None
         self.latest_detections: list[dict] = []
 
+        # Per-frame scratch arrays, owned by the capture thread. Every frame is
+        # JPEG-encoded before the next read, so they can be overwritten in place.
+        self._frame_buf: Optional[np.ndarray] = None
+        self._sharp_buf: Optional[np.ndarray] = None
+        self._infer_buf: Optional[np.ndarray] = None
+
         self.mode = "raw"
         self.enabled = False
         self.last_error: Optional[str] = None
@@ -68,12 +107,19 @@ class CameraService:
         )
 
         self.model = None
+        self.half = False
         if YOLO is None:
             self.last_error = "ultralytics is not installed; detection disabled"
         elif MODEL_PATH.exists():
             try:
-                self.model = YOLO(str(MODEL_PATH))
+                self.model = YOLO(str(MODEL_PATH), task="detect")
                 self.last_error = None
+                # FP16 on the GPU for eager .pt weights; exported engines fix their own precision
+                self.half = (
+                    MODEL_PATH.suffix == ".pt"
+                    and torch is not None
+                    and torch.cuda.is_available()
+                )
             except Exception as e:
                 self.model = None
                 self.last_error = f"Failed to load model: {e}"
@@ -264,6 +310,13 @@ class CameraService:
         self.consecutive_failures = 0
 
     def _encode_jpeg(self, frame: np.ndarray) -> Optional[bytes]:
+        if _TJ is not None:
+            try:
+                return _TJ.encode(
+                    frame, quality=int(self.jpeg_quality), jpeg_subsample=TJSAMP_420
+                )
+            except Exception:
+                pass
         ok, buf = cv2.imencode(
             ".jpg",
             frame,
@@ -275,31 +328,40 @@ class CameraService:
 
     def _run_detection(self, frame: np.ndarray) -> tuple[np.ndarray, list[dict]]:
         if self.model is None:
-            return frame.copy(), []
+            return frame, []
 
-        sharp = cv2.filter2D(frame, -1, self.kernel)
+        if self._sharp_buf is None or self._sharp_buf.shape != frame.shape:
+            self._sharp_buf = np.empty_like(frame)
+            self._infer_buf = None
+        sharp = cv2.filter2D(frame, -1, self.kernel, dst=self._sharp_buf)
         h, w = sharp.shape[:2]
-        infer = cv2.resize(sharp, (self.infer_size, self.infer_size))
+        infer = self._infer_buf = cv2.resize(
+            sharp, (self.infer_size, self.infer_size), dst=self._infer_buf
+        )
 
-        results = self.model(infer, verbose=False, conf=self.detect_conf)
+        results = self.model(infer, verbose=False, conf=self.detect_conf, half=self.half)
 
-        annotated = sharp.copy()
+        # boxes are drawn straight onto the sharpened frame; it is not reused
+        annotated = sharp
         detections: list[dict] = []
 
-        scale_x = w / self.infer_size
-        scale_y = h / self.infer_size
+        scale = np.array(
+            [w / self.infer_size, h / self.infer_size] * 2, dtype=np.float32
+        )
+        upper = np.array([w - 1, h - 1] * 2, dtype=np.float32)
 
         for r in results:
-            for box in r.boxes:
-                x1, y1, x2, y2 = box.xyxy[0].tolist()
-                cls_id = int(box.cls[0].item())
-                conf = float(box.conf[0].item())
-                label = self.model.names[cls_id]
+            if r.boxes is None or len(r.boxes) == 0:
+                continue
+
+            # One device->host copy per result: rows are x1,y1,x2,y2,conf,cls
+            data = r.boxes.data.cpu().numpy()
+            xyxy = np.clip(data[:, :4] * scale, 0, upper).astype(np.int32).tolist()
+            confs = data[:, 4].tolist()
+            cls_ids = data[:, 5].astype(np.int32).tolist()
 
-                x1 = int(x1 * scale_x)
-                x2 = int(x2 * scale_x)
-                y1 = int(y1 * scale_y)
-                y2 = int(y2 * scale_y)
+            for (x1, y1, x2, y2), conf, cls_id in zip(xyxy, confs, cls_ids):
+                label = self.model.names[cls_id]
 
                 detections.append(
                     {
@@ -343,8 +405,9 @@ class CameraService:
                 if self.cap is None:
                     self.cap = self._open_camera()
 
-                ret, frame = self.cap.read()
+                ret, frame = self.cap.read(self._frame_buf)
                 if not ret or frame is None or getattr(frame, "size", 0) == 0:
+                    self._frame_buf = None
                     self.consecutive_failures += 1
                     self.last_error = (
                         f"Failed to read frame ({self.consecutive_failures}) "
@@ -362,6 +425,7 @@ class CameraService:
                     continue
 
                 self.consecutive_failures = 0
+                self._frame_buf = frame
 
                 raw_jpeg = self._encode_jpeg(frame)
 
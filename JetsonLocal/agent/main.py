@@ -8,7 +8,6 @@ from typing import Iterator, Optional
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import StreamingResponse
 import uvicorn
-import requests
 
 # -------------------------------------------------------------------
 # PATH SETUP
@@ -509,7 +508,7 @@ def upload_latest_frame_once():
         "mode": mode,
     }
 
-    resp = requests.post(url, params=params, headers=headers, data=frame, timeout=5)
+    resp = api.session.post(url, params=params, headers=headers, data=frame, timeout=5)
 
     if not resp.ok:
         try:
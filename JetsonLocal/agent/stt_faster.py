@@ -116,29 +116,55 @@ WAKE_AURA_ALIASES = [
 # ============================================================
 # TEXT HELPERS
 # ============================================================
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_SPACES_RE = re.compile(r"\s+")
+
+
 def normalize_text(text: str) -> str:
     text = text.lower()
     text = text.replace("a u r a", "aura")
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _NON_ALNUM_RE.sub(" ", text)
+    text = _SPACES_RE.sub(" ", text).strip()
     return text
 
 
+# All patterns below are built once at import; every transcript used to
+# re-normalize the phrase tables and rebuild each pattern per call.
+_BAD_WORD_RE = re.compile(r"(?i)\b(" + "|".join(BAD_WORD_PATTERNS) + r")\b")
+
+_WAKE_EXACT = []
+for _prefix in WAKE_PREFIXES:
+    for _alias in WAKE_AURA_ALIASES:
+        _cand = normalize_text(f"{_prefix} {_alias}")
+        _WAKE_EXACT.append((_cand, re.compile(rf"\b{re.escape(_cand)}\b")))
+
+_WAKE_FALLBACK_SUBS = [
+    re.compile(r"\b(hey|hi|ok|okay|yo)\b"),
+    re.compile(r"\b(aura|ora|or|oura|arua)\b"),
+    re.compile(r"\bor a\b"),
+]
+
+_ACTION_WORD_RE = re.compile(r"\b(?:" + "|".join(re.escape(w) for w in ACTION_WORDS) + r")\b")
+
+_SINGLE_WORD_DIRECTIONS = {"left", "right", "forward", "back", "backward", "stop"}
+_MOVEMENT_RES = []
+for _command, _phrases in MOVEMENT_PATTERNS.items():
+    for _phrase in _phrases:
+        _phrase_norm = normalize_text(_phrase)
+        _MOVEMENT_RES.append((
+            _command,
+            _phrase_norm,
+            _phrase_norm in _SINGLE_WORD_DIRECTIONS,
+            re.compile(rf"\b{re.escape(_phrase_norm)}\b"),
+        ))
+
+
 def censor_text(text: str) -> str:
-    for pattern in BAD_WORD_PATTERNS:
-        text = re.sub(
-            rf"(?i)\b({pattern})\b",
-            lambda m: "█" * len(m.group(0)),
-            text,
-        )
-    return text
+    return _BAD_WORD_RE.sub(lambda m: "█" * len(m.group(0)), text)
 
 
 def contains_bad_language(text: str) -> bool:
-    for pattern in BAD_WORD_PATTERNS:
-        if re.search(rf"(?i)\b({pattern})\b", text):
-            return True
-    return False
+    return _BAD_WORD_RE.search(text) is not None
 
 
 def wake_score(text: str) -> Tuple[bool, str, str]:
@@ -148,15 +174,8 @@ def wake_score(text: str) -> Tuple[bool, str, str]:
 
     tokens = norm.split()
 
-    candidates = []
-    for prefix in WAKE_PREFIXES:
-        for alias in WAKE_AURA_ALIASES:
-            candidates.append(f"{prefix} {alias}")
-
-    for cand in candidates:
-        cand_norm = normalize_text(cand)
-        pattern = rf"\b{re.escape(cand_norm)}\b"
-        m = re.search(pattern, norm)
+    for cand_norm, pattern in _WAKE_EXACT:
+        m = pattern.search(norm)
         if m:
             leftover = norm[m.end():].strip()
             return True, leftover, f"exact:{cand_norm}"
@@ -187,10 +206,9 @@ def wake_score(text: str) -> Tuple[bool, str, str]:
 
     if WAKE_MATCH_MODE == 1 and has_prefix and has_auraish:
         cleaned = norm
-        cleaned = re.sub(r"\b(hey|hi|ok|okay|yo)\b", " ", cleaned, count=1)
-        cleaned = re.sub(r"\b(aura|ora|or|oura|arua)\b", " ", cleaned, count=1)
-        cleaned = re.sub(r"\bor a\b", " ", cleaned, count=1)
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
+        for pattern in _WAKE_FALLBACK_SUBS:
+            cleaned = pattern.sub(" ", cleaned, count=1)
+        cleaned = _SPACES_RE.sub(" ", cleaned).strip()
         return True, cleaned, "fallback_prefix+auraish"
 
     return False, "", "no_match"
@@ -208,30 +226,16 @@ def detect_last_movement_command(text: str) -> Optional[str]:
     if not norm:
         return None
 
-    has_action_word = any(
-        re.search(rf"\b{re.escape(word)}\b", norm) for word in ACTION_WORDS
-    )
+    has_action_word = _ACTION_WORD_RE.search(norm) is not None
     word_count = len(norm.split())
     matches = []
 
-    for command, phrases in MOVEMENT_PATTERNS.items():
-        for phrase in phrases:
-            phrase_norm = normalize_text(phrase)
-            is_single_word_direction = phrase_norm in {
-                "left",
-                "right",
-                "forward",
-                "back",
-                "backward",
-                "stop",
-            }
-
-            if is_single_word_direction and word_count > 2 and not has_action_word:
-                continue
+    for command, phrase_norm, is_single_word_direction, pattern in _MOVEMENT_RES:
+        if is_single_word_direction and word_count > 2 and not has_action_word:
+            continue
 
-            pattern = rf"\b{re.escape(phrase_norm)}\b"
-            for match in re.finditer(pattern, norm):
-                matches.append((match.start(), command, phrase_norm))
+        for match in pattern.finditer(norm):
+            matches.append((match.start(), command, phrase_norm))
 
     if not matches:
         return None
@@ -14,6 +14,7 @@ python3-pip \
 python3-venv \
 curl \
 portaudio19-dev \
+libturbojpeg \
 python3-pyaudio \
 flac
 
@@ -7,6 +7,8 @@ print("Changed working directory to:", os.getcwd())
 
 from ultralytics import YOLO
 import cv2
+import numpy as np
+import torch
 
 
 def main():
@@ -14,6 +16,12 @@ def main():
     component_model = YOLO("component_best.pt")     # your original component detector
     color_model     = YOLO("colorcode_best.pt")     # your resistor-value model (new)
 
+    # Adjust this if your class name isn't exactly "resistor"
+    resistor_ids = np.array(
+        [i for i, name in component_model.names.items() if name.lower() == "resistor"],
+        dtype=np.int32,
+    )
+
     # (Optional) quick sanity print
     # print("Component classes:", component_model.names)
     # print("Color-code classes:", color_model.names)
@@ -25,6 +33,8 @@ def main():
     CONF = 0.5
     COLOR_IMGSZ = 320        # smaller is faster for cropped resistor
     COLOR_CONF = 0.5
+    MIN_CROP = 24            # resistors smaller than this (px) are too small to read bands
+    HALF = torch.cuda.is_available()  # FP16 inference on the Jetson GPU
     # ----------------------------------
 
     # Your original (unused) gst string kept intact
@@ -56,10 +66,7 @@ def main():
     frame_i = 0
     last_result = None  # store last component detections
     last_frame_for_result = None  # store the frame used for last_result inference
-
-    # Helper: safe clamp
-    def clamp(v, lo, hi):
-        return max(lo, min(hi, v))
+    last_labels = []  # (x1, y1, text) from the color stage of the last inference tick
 
     while True:
         ret, frame = cap.read()
@@ -69,58 +76,56 @@ def main():
 
         frame_i += 1
 
-        # Run component inference every N frames
+        # Run both stages every N frames: component detection, then the color
+        # model on the resistor crops of that same frame. In-between frames only
+        # redraw the cached boxes and labels.
         if (frame_i % INFER_EVERY) == 0 or last_result is None:
             last_frame_for_result = frame.copy()
             last_result = component_model.predict(
-                last_frame_for_result, conf=CONF, imgsz=IMGSZ, verbose=False
+                last_frame_for_result, conf=CONF, imgsz=IMGSZ, half=HALF, verbose=False
             )[0]
 
-        # Always display the *current* live frame
-        display = frame.copy()
-
-        # Draw component detections on current frame
-        if last_result is not None:
-            display = last_result.plot(img=display)
-
             # ----- Stage 2: if resistor found, run color model on cropped ROI -----
-            # Note: we use the CURRENT frame for crop so it lines up with display.
-            # If you'd rather use the exact frame used for last_result, replace `frame` with `last_frame_for_result`.
-            H, W = frame.shape[:2]
-
-            for box in last_result.boxes:
-                cls_id = int(box.cls[0])
-                comp_label = component_model.names.get(cls_id, str(cls_id))
-
-                # Adjust this if your class name isn't exactly "resistor"
-                if comp_label.lower() != "resistor":
-                    continue
-
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-                # Clamp to image bounds (prevents crashes)
-                x1 = clamp(x1, 0, W - 1)
-                x2 = clamp(x2, 0, W - 1)
-                y1 = clamp(y1, 0, H - 1)
-                y2 = clamp(y2, 0, H - 1)
-
-                # Ensure valid box
-                if x2 <= x1 or y2 <= y1:
-                    continue
-
-                crop = frame[y1:y2, x1:x2]
-                if crop.size == 0:
-                    continue
+            src = last_frame_for_result
+            H, W = src.shape[:2]
+
+            # First pass: collect every resistor crop so the color model runs once per frame
+            crops = []
+            crop_boxes = []
+
+            # One device->host copy: rows are x1,y1,x2,y2,conf,cls
+            data = last_result.boxes.data.cpu().numpy()
+            data = data[np.isin(data[:, 5].astype(np.int32), resistor_ids)]
+
+            # Clamp to image bounds (prevents crashes) and keep only boxes big
+            # enough for the color model; tiny crops would just be upscaled noise
+            xyxy = data[:, :4].astype(np.int32)
+            np.clip(xyxy[:, 0::2], 0, W - 1, out=xyxy[:, 0::2])
+            np.clip(xyxy[:, 1::2], 0, H - 1, out=xyxy[:, 1::2])
+            sizes = np.minimum(xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1])
+            xyxy = xyxy[sizes >= MIN_CROP]
+
+            for x1, y1, x2, y2 in xyxy.tolist():
+                crop = src[y1:y2, x1:x2]
+
+                # Pre-size so Ultralytics skips its per-image letterbox work
+                crops.append(
+                    cv2.resize(crop, (COLOR_IMGSZ, COLOR_IMGSZ), interpolation=cv2.INTER_AREA)
+                )
+                crop_boxes.append((x1, y1))
 
-                # Run colorcode/value model on cropped resistor
-                value_result = color_model.predict(
-                    crop, conf=COLOR_CONF, imgsz=COLOR_IMGSZ, verbose=False
-                )[0]
+            # Run colorcode/value model on all cropped resistors in one batched call
+            value_results = []
+            if crops:
+                value_results = color_model.predict(
+                    crops, conf=COLOR_CONF, imgsz=COLOR_IMGSZ, half=HALF, verbose=False
+                )
 
+            last_labels = []
+            for value_result, (x1, y1) in zip(value_results, crop_boxes):
                 if value_result is None or value_result.boxes is None or len(value_result.boxes) == 0:
                     # If you want, show "unknown" above resistor
-                    # cv2.putText(display, "unknown resistor", (x1, max(0, y1 - 10)),
-                    #             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                    # last_labels.append((x1, y1, "unknown resistor"))
                     continue
 
                 # Take the highest-confidence prediction from the crop
@@ -130,8 +135,17 @@ def main():
 
                 # Format text how you want
                 spoken_text = value_name.replace(" ohms", "") + " resistor"
+                last_labels.append((x1, y1, spoken_text))
+
+        # Always display the *current* live frame
+        display = frame.copy()
+
+        # Draw component detections on current frame
+        if last_result is not None:
+            display = last_result.plot(img=display)
 
-                # Put text above the resistor bbox
+            # Put text above each resistor bbox
+            for x1, y1, spoken_text in last_labels:
                 cv2.putText(
                     display,
                     spoken_text,
@@ -2,22 +2,25 @@
 import os
 import time
 import json
+import asyncio
 import random
-import smtplib
+from collections import OrderedDict
 from email.message import EmailMessage
 from pathlib import Path
 from typing import Dict, Any, List
 
-from fastapi import APIRouter, Request, HTTPException, Response
+from fastapi import APIRouter, BackgroundTasks, Request, HTTPException, Response
 from pydantic import BaseModel
 
-from security import require_ip_allowlist, require_auth, require_role
+from security import require_ip_allowlist, require_auth, require_role, norm_email, get_client_ip
 from security_tokens import mint_app_token, revoke_user_tokens
 from hash_passwords import (
     verify_password as verify_pbkdf2_password,
     hash_password as hash_pbkdf2_password,
+    needs_rehash as password_needs_rehash,
 )
-from otp_store import OTPStore, hash_code
+from otp_store import OTPStore
+from smtp_sender import SmtpSender
 from config import ADMIN_USERS_PATH, ensure_storage_layout
 
 try:
@@ -25,6 +28,11 @@ try:
 except Exception:
     load_dotenv = None
 
+try:
+    import redis
+except Exception:
+    redis = None
+
 env = (os.getenv("ENV", "") or "").lower()
 if env in ("", "dev", "local") and load_dotenv is not None:
     env_path = Path(__file__).resolve().parents[1] / ".env"
@@ -36,6 +44,7 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASS = os.getenv("SMTP_PASS", "")
 SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER)
+mailer = SmtpSender(SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS)
 
 ADMIN_OTP_TTL_SECONDS = int(os.getenv("ADMIN_OTP_TTL_SECONDS", "300"))
 ADMIN_MAX_OTP_ATTEMPTS = int(os.getenv("ADMIN_MAX_OTP_ATTEMPTS", "5"))
@@ -43,9 +52,20 @@ ADMIN_MAX_OTP_ATTEMPTS = int(os.getenv("ADMIN_MAX_OTP_ATTEMPTS", "5"))
 ADMIN_LOGIN_RATE_WINDOW = int(os.getenv("ADMIN_LOGIN_RATE_WINDOW", "300"))
 ADMIN_LOGIN_RATE_MAX = int(os.getenv("ADMIN_LOGIN_RATE_MAX", "10"))
 
+# With REDIS_URL set (and redis-py installed) the login rate limit is shared by
+# every worker; otherwise each process counts on its own
+REDIS_URL = os.getenv("REDIS_URL", "")
+_REDIS = (
+    redis.Redis.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    if redis is not None and REDIS_URL
+    else None
+)
+
 COOKIE_NAME = os.getenv("AUTH_COOKIE_NAME", "aura_token")
 COOKIE_SAMESITE = os.getenv("AUTH_COOKIE_SAMESITE", "lax")
-COOKIE_DOMAIN = os.getenv("AUTH_COOKIE_DOMAIN", "")
+COOKIE_DOMAIN = os.getenv("AUTH_COOKIE_DOMAIN", "").strip()
+_COOKIE_KWARGS: Dict[str, Any] = {"domain": COOKIE_DOMAIN} if COOKIE_DOMAIN else {}
+_ENV_IS_PROD = (os.getenv("ENV", "") or "").lower() in ("prod", "production")
 
 router = APIRouter(prefix="/auth/admin", tags=["admin-auth"])
 otp_store = OTPStore(prefix="adminotp")
@@ -70,29 +90,48 @@ class AdminPublic(BaseModel):
     email: str
 
 
-_RATE: Dict[str, Dict[str, Any]] = {}
+# ip -> [window start (monotonic s), attempts]; least recently seen IPs are
+# evicted past RATE_MAX_IPS so a scan of many source IPs can't grow it forever
+RATE_MAX_IPS = 100_000
+_RATE: "OrderedDict[str, List[float]]" = OrderedDict()
 
 
-def _client_ip(request: Request) -> str:
-    xff = request.headers.get("x-forwarded-for", "")
-    if xff:
-        return xff.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
+def _rate_limit_or_429_redis(ip: str) -> bool:
+    """One MULTI/EXEC round-trip on a fixed-window counter; False if Redis is unusable."""
+    bucket = int(time.time()) // ADMIN_LOGIN_RATE_WINDOW
+    key = f"aura:adminrate:{ip}:{bucket}"
+    try:
+        pipe = _REDIS.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, ADMIN_LOGIN_RATE_WINDOW)
+        count = int(pipe.execute()[0])
+    except Exception as e:
+        print(f"[ADMIN AUTH] redis rate limit unavailable, using in-process: {e}")
+        return False
+    if count > ADMIN_LOGIN_RATE_MAX:
+        raise HTTPException(status_code=429, detail="Too many requests")
+    return True
 
 
 def _rate_limit_or_429(ip: str):
-    now = int(time.time())
+    if _REDIS is not None and _rate_limit_or_429_redis(ip):
+        return
+    now = time.monotonic()
     rec = _RATE.get(ip)
-    if not rec or now - rec["start"] >= ADMIN_LOGIN_RATE_WINDOW:
-        _RATE[ip] = {"start": now, "count": 1}
+    if rec is None or now - rec[0] >= ADMIN_LOGIN_RATE_WINDOW:
+        _RATE[ip] = [now, 1]
+        _RATE.move_to_end(ip)
+        while len(_RATE) > RATE_MAX_IPS:
+            _RATE.popitem(last=False)
         return
-    rec["count"] += 1
-    if rec["count"] > ADMIN_LOGIN_RATE_MAX:
+    _RATE.move_to_end(ip)
+    rec[1] += 1
+    if rec[1] > ADMIN_LOGIN_RATE_MAX:
         raise HTTPException(status_code=429, detail="Too many requests")
 
 
-def _send_otp_email(to_email: str, code: str):
-    if not SMTP_HOST or not SMTP_USER or not SMTP_PASS:
+def _send_otp_email(background_tasks: BackgroundTasks, to_email: str, code: str):
+    if not mailer.configured():
         raise HTTPException(status_code=500, detail="SMTP not configured")
 
     msg = EmailMessage()
@@ -105,17 +144,12 @@ def _send_otp_email(to_email: str, code: str):
         f"If you did not request this, ignore this email."
     )
 
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
+    # Delivered after the response goes out; the SMTP round-trips don't gate it
+    background_tasks.add_task(mailer.deliver, msg)
 
 
 def _should_secure_cookie(request: Request) -> bool:
-    envv = (os.getenv("ENV", "") or "").lower()
-    if envv in ("prod", "production"):
-        return True
-    return request.url.scheme == "https"
+    return _ENV_IS_PROD or request.url.scheme == "https"
 
 
 def _read_admin_store() -> Dict[str, Any]:
@@ -140,7 +174,7 @@ def _read_admin_store() -> Dict[str, Any]:
     for a in admins_list:
         if not isinstance(a, dict):
             continue
-        email = (a.get("email") or "").strip().lower()
+        email = norm_email(a.get("email"))
         ph = (a.get("password_hash") or "").strip()
         if email and ph:
             cleaned.append({
@@ -165,26 +199,35 @@ def _load_admins_map() -> Dict[str, str]:
     data = _read_admin_store()
     out: Dict[str, str] = {}
     for a in data.get("admins", []):
-        email = (a.get("email") or "").strip().lower()
+        email = norm_email(a.get("email"))
         ph = (a.get("password_hash") or "").strip()
         if email and ph:
             out[email] = ph
     return out
 
 
+def _rehash_admin_password(email: str, password: str) -> None:
+    data = _read_admin_store()
+    for a in data.get("admins", []):
+        if a.get("email") == email:
+            a["password_hash"] = hash_pbkdf2_password(password)
+            _write_admin_store(data)
+            return
+
+
 def _require_admin(request: Request) -> Dict[str, Any]:
     require_ip_allowlist(request)
     return require_role(request, "admin")
 
 
 @router.post("/login")
-async def login(data: AdminLoginRequest, request: Request):
+async def login(data: AdminLoginRequest, request: Request, background_tasks: BackgroundTasks):
     require_ip_allowlist(request)
 
-    ip = _client_ip(request)
+    ip = get_client_ip(request)
     _rate_limit_or_429(ip)
 
-    email = (data.email or "").strip().lower()
+    email = norm_email(data.email)
     password = (data.password or "").strip()
 
     invalid = HTTPException(status_code=401, detail="Invalid credentials")
@@ -197,12 +240,19 @@ async def login(data: AdminLoginRequest, request: Request):
     if not stored_hash:
         raise invalid
 
-    if not verify_pbkdf2_password(password, stored_hash):
+    # Password hashing is ~100ms of CPU; keep it off the event loop
+    if not await asyncio.to_thread(verify_pbkdf2_password, password, stored_hash):
         raise invalid
 
+    if password_needs_rehash(stored_hash):
+        try:
+            await asyncio.to_thread(_rehash_admin_password, email, password)
+        except Exception as e:
+            print(f"[admin_auth] password rehash failed for {email}: {e}")
+
     code = f"{random.randint(100000, 999999)}"
     otp_store.set(email=email, code=code, ttl_seconds=ADMIN_OTP_TTL_SECONDS)
-    _send_otp_email(email, code)
+    _send_otp_email(background_tasks, email, code)
 
     return {"message": "OTP sent", "otp_expires_in": ADMIN_OTP_TTL_SECONDS}
 
@@ -211,37 +261,19 @@ async def login(data: AdminLoginRequest, request: Request):
 async def verify(data: AdminVerifyRequest, request: Request, response: Response):
     require_ip_allowlist(request)
 
-    email = (data.email or "").strip().lower()
+    email = norm_email(data.email)
     otp = (data.otp or "").strip()
 
-    invalid = HTTPException(status_code=401, detail="Invalid code")
-
-    rec = otp_store.get(email)
-    if not rec:
-        raise invalid
-
-    if int(rec.get("expires", 0) or 0) and time.time() > int(rec["expires"]):
-        otp_store.delete(email)
-        raise invalid
-
-    attempts = otp_store.incr_attempts(email)
-    if attempts > ADMIN_MAX_OTP_ATTEMPTS:
-        otp_store.delete(email)
+    outcome = otp_store.verify_attempt(email, otp, ADMIN_MAX_OTP_ATTEMPTS)
+    if outcome == "too_many":
         raise HTTPException(status_code=429, detail="Too many attempts")
-
-    if hash_code(otp) != rec.get("otp_hash"):
-        raise invalid
-
-    otp_store.delete(email)
+    if outcome != "ok":
+        raise HTTPException(status_code=401, detail="Invalid code")
 
     result = mint_app_token(email=email, role="admin")
     token = result["token"]
 
     secure_cookie = _should_secure_cookie(request)
-    cookie_kwargs: Dict[str, Any] = {}
-    if COOKIE_DOMAIN.strip():
-        cookie_kwargs["domain"] = COOKIE_DOMAIN.strip()
-
     response.set_cookie(
         key=COOKIE_NAME,
         value=token,
@@ -249,7 +281,7 @@ async def verify(data: AdminVerifyRequest, request: Request, response: Response)
         secure=secure_cookie,
         samesite=COOKIE_SAMESITE,
         max_age=result["expires_in"],
-        **cookie_kwargs,
+        **_COOKIE_KWARGS,
     )
 
     return {"token": token, "user": result["user"], "expires_in": result["expires_in"]}
@@ -276,7 +308,7 @@ def list_admins(request: Request):
     _require_admin(request)
     data = _read_admin_store()
     admins = sorted({
-        (a.get("email") or "").strip().lower()
+        norm_email(a.get("email"))
         for a in data.get("admins", [])
         if isinstance(a, dict)
     })
@@ -287,9 +319,9 @@ def list_admins(request: Request):
 @router.post("/admins")
 def add_admin(req: AdminCreateRequest, request: Request):
     payload = _require_admin(request)
-    actor = (payload.get("sub") or "").strip().lower()
+    actor = norm_email(payload.get("sub"))
 
-    email = (req.email or "").strip().lower()
+    email = norm_email(req.email)
     password = (req.password or "").strip()
 
     if not email or "@" not in email:
@@ -301,7 +333,7 @@ def add_admin(req: AdminCreateRequest, request: Request):
     admins_list: List[Dict[str, Any]] = data.get("admins", [])
 
     exists = any(
-        isinstance(a, dict) and (a.get("email") or "").strip().lower() == email
+        isinstance(a, dict) and norm_email(a.get("email")) == email
         for a in admins_list
     )
     if exists:
@@ -324,9 +356,9 @@ def add_admin(req: AdminCreateRequest, request: Request):
 @router.delete("/admins/{email}")
 def remove_admin(email: str, request: Request):
     payload = _require_admin(request)
-    actor = (payload.get("sub") or "").strip().lower()
+    actor = norm_email(payload.get("sub"))
 
-    target = (email or "").strip().lower()
+    target = norm_email(email)
     if not target or "@" not in target:
         raise HTTPException(status_code=400, detail="Invalid email")
 
@@ -341,7 +373,7 @@ def remove_admin(email: str, request: Request):
     for a in admins_list:
         if not isinstance(a, dict):
             continue
-        e = (a.get("email") or "").strip().lower()
+        e = norm_email(a.get("email"))
         if e == target:
             removed = True
             continue
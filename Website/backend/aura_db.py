@@ -1,5 +1,6 @@
 import os
 import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -15,8 +16,24 @@ def _conn() -> sqlite3.Connection:
     c.row_factory = sqlite3.Row
     return c
 
+# Schema setup runs once per process; later init_db() calls are a flag check
+_DB_INITED = False
+_INIT_LOCK = threading.Lock()
+
 def init_db() -> None:
+    global _DB_INITED
+    if _DB_INITED:
+        return
+    with _INIT_LOCK:
+        if _DB_INITED:
+            return
+        _create_schema()
+        _DB_INITED = True
+
+def _create_schema() -> None:
     with _conn() as con:
+        # WAL lets readers proceed during owner/TA writes; the setting persists in the DB file
+        con.execute("PRAGMA journal_mode=WAL")
         con.execute(
             """
             CREATE TABLE IF NOT EXISTS ta_users (
@@ -179,11 +179,13 @@ def stream_camera(device_id: str = Query(...)):
 
         while True:
             try:
-                if not frame_path.exists():
+                # One lstat per poll (exists() + stat() was two)
+                try:
+                    stat = os.stat(frame_path, follow_symlinks=False)
+                except FileNotFoundError:
                     time.sleep(0.05)
                     continue
 
-                stat = frame_path.stat()
                 if stat.st_mtime_ns == last_mtime_ns:
                     time.sleep(0.01)
                     continue
@@ -2,16 +2,28 @@
 import os
 import json
 import shutil
+import asyncio
+import threading
 import time
 import math
 import re
-from typing import List, Optional, Dict, Any, Tuple, Iterable
-
-from fastapi import Form, APIRouter, UploadFile, File, HTTPException, Request
+import errno
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Iterator, AsyncIterator, Callable
+
+from fastapi import Form, APIRouter, UploadFile, File, Header, HTTPException, Request
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from pypdf import PdfReader
 
+try:
+    import pypdfium2 as pdfium  # PDFium (C++) text extraction, much faster than pypdf
+except Exception:
+    pdfium = None
+
 from security import require_auth, require_ip_allowlist
 from aura_db import init_db, doc_set_owner, doc_get_owner, doc_delete_owner, doc_move_owner
 
@@ -35,6 +47,12 @@ try:
 except Exception:
     HAS_RAG = False
 
+# Optional: token-aware chunking; the encoding is loaded on first use
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
 # ---------------------------
 # Paths / env
 # ---------------------------
@@ -63,6 +81,32 @@ DEFAULT_LLM = os.getenv("AURA_LLM_MODEL", "llama3.2:3b")
 DEFAULT_EMBED = os.getenv("AURA_EMBED_MODEL", "nomic-embed-text")
 OLLAMA_URL = os.getenv("AURA_OLLAMA_URL", "http://127.0.0.1:11434")
 
+# Concurrent ainsert_many workers during a LightRAG build (each one holds an Ollama embed batch in flight)
+BUILD_WORKERS = max(1, int(os.getenv("AURA_BUILD_WORKERS", "4")))
+BUILD_QUEUE_MAX = 8  # chunk batches waiting to be embedded
+# Chunks from consecutive files are pooled up to this many per ainsert_many, so
+# a folder of small files still fills whole embed batches
+BUILD_BATCH_CHUNKS = max(1, int(os.getenv("AURA_BUILD_BATCH_CHUNKS", "128")))
+
+# PDF extraction is CPU-bound (pypdf is pure Python), so builds run it in worker processes
+# (created on first build), keeping up to 2*EXTRACT_WORKERS files in flight
+EXTRACT_WORKERS = max(1, int(os.getenv("AURA_EXTRACT_WORKERS", str(os.cpu_count() or 1))))
+_EXTRACT_POOL: Optional[ProcessPoolExecutor] = None
+_EXTRACT_POOL_LOCK = threading.Lock()
+
+# AURA_CHUNK_MODE=tokens: K-token windows, a new one every STRIDE tokens
+# (default 0.75*K, i.e. 25% overlap). "chars" (or no tiktoken) uses CHUNK_CHARS-char
+# windows overlapping by CHUNK_OVERLAP_CHARS.
+CHUNK_MODE = (os.getenv("AURA_CHUNK_MODE", "tokens") or "tokens").strip().lower()
+CHUNK_TOKENS = max(16, int(os.getenv("AURA_CHUNK_TOKENS", "512")))
+CHUNK_STRIDE = int(os.getenv("AURA_CHUNK_STRIDE", "0")) or int(0.75 * CHUNK_TOKENS)
+CHUNK_STRIDE = max(1, min(CHUNK_TOKENS, CHUNK_STRIDE))
+CHUNK_CHARS = 2400
+CHUNK_OVERLAP_CHARS = 250
+
+# Uploads are copied to disk in chunks of this size on a worker thread
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 DEFAULT_CHAT_MODE = os.getenv("AURA_CHAT_MODE", "vector")  # vector|bm25|hybrid (only used in LightRAG mode)
 DEFAULT_TOP_K = int(os.getenv("AURA_TOP_K", "4"))
 
@@ -122,16 +166,93 @@ def require_owner_or_admin(request: Request, rel_path: str) -> Dict[str, Any]:
 # ---------------------------
 # Path helpers
 # ---------------------------
+# Striped so the lock table stays fixed-size whatever paths clients send.
+# In-process only: across workers each owner-row write is its own SQLite transaction.
+_PATH_LOCKS = [threading.Lock() for _ in range(64)]
+
+def _path_locks(*rels: str) -> List[threading.Lock]:
+    """Locks covering these documents, deduped and in stable order (acquire in order)."""
+    idx = sorted({hash(rel) % len(_PATH_LOCKS) for rel in rels})
+    return [_PATH_LOCKS[i] for i in idx]
+
+def _set_owner_if_present(full: str, rel: str, owner_email: str, owner_role: str) -> None:
+    # Under the path lock so a concurrent delete/move can't leave an owner row
+    # for a file that is already gone
+    (lk,) = _path_locks(rel)
+    with lk:
+        if os.path.exists(full):
+            doc_set_owner(rel, owner_email, owner_role)
+
+def _move_file(src: str, dst: str) -> None:
+    """rename() when possible; across filesystems copy with sendfile, else shutil.move."""
+    if os.path.isdir(dst):
+        shutil.move(src, dst)
+        return
+    try:
+        os.replace(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    if not hasattr(os, "sendfile"):
+        shutil.move(src, dst)
+        return
+    try:
+        size = os.path.getsize(src)
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(fout.fileno(), fin.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        shutil.copystat(src, dst)
+    except OSError:
+        shutil.move(src, dst)
+        return
+    os.unlink(src)
+
+def _copy_upload(src, dst: str) -> int:
+    # Written beside dst and renamed into place, so a sync_down or build running
+    # meanwhile never reads a half-copied file and a failed upload leaves no stub
+    src.seek(0)
+    part = f"{dst}.part-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(part, "wb") as w:
+            shutil.copyfileobj(src, w, UPLOAD_CHUNK_SIZE)
+            size = w.tell()
+        os.replace(part, dst)
+    except BaseException:
+        try:
+            os.unlink(part)
+        except OSError:
+            pass
+        raise
+    return size
+
+async def _save_upload(f: UploadFile, dst: str) -> int:
+    """Stream an UploadFile's spooled body to dst off the event loop; returns bytes written."""
+    return await asyncio.to_thread(_copy_upload, f.file, dst)
+
+_ROOT_ABS: Dict[str, str] = {}
+_DB_BAD = re.compile(r'[\\/:*?"<>|]')
+_UPLOAD_NAME_BAD = re.compile(r'\x00|^\.{1,2}$')
+
+VECTOR_DB_FILES = frozenset({"faiss.index", "embeddings.npy", "meta.json", "db.json"})
+
 def _safe_join(root: str, rel: str) -> str:
     rel = (rel or "").replace("\\", "/").lstrip("/")
-    full = os.path.abspath(os.path.join(root, rel))
-    root_abs = os.path.abspath(root)
-    if not full.startswith(root_abs):
+    root_abs = _ROOT_ABS.get(root)
+    if root_abs is None:
+        root_abs = _ROOT_ABS[root] = os.path.abspath(root)
+    full = os.path.normpath(os.path.join(root_abs, rel))
+    # commonpath (not startswith) so "/docs-evil" is not accepted under "/docs"
+    if full != root_abs and os.path.commonpath((root_abs, full)) != root_abs:
         raise HTTPException(status_code=400, detail="Invalid path")
     return full
 
 def _db_dir(db_name: str) -> str:
-    if not db_name or any(c in db_name for c in r'\/:*?"<>|'):
+    if not db_name or _DB_BAD.search(db_name):
         raise HTTPException(status_code=400, detail="Invalid database name")
     return os.path.join(RAG_ROOT_DIR, db_name)
 
@@ -141,6 +262,25 @@ def _db_config_path(db_name: str) -> str:
 def _db_workdir(db_name: str) -> str:
     return _db_dir(db_name)
 
+def _db_manifest_path(db_name: str) -> str:
+    # LightRAG builds: rel source -> [mtime_ns, size, chunk_count] of what is indexed
+    return os.path.join(_db_workdir(db_name), "manifest.json")
+
+def _load_manifest(db_name: str) -> Dict[str, List[int]]:
+    try:
+        with open(_db_manifest_path(db_name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def _save_manifest(db_name: str, manifest: Dict[str, List[int]]) -> None:
+    path = _db_manifest_path(db_name)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
 def _db_chunks_path(db_name: str) -> str:
     # Azure-safe simple index storage
     return os.path.join(_db_dir(db_name), "chunks.jsonl")
@@ -159,11 +299,35 @@ def _save_db_config(db_name: str, cfg: Dict[str, Any]):
     os.makedirs(_db_dir(db_name), exist_ok=True)
     with open(_db_config_path(db_name), "w", encoding="utf-8") as f:
         json.dump(cfg, f, indent=2)
+    _invalidate_db_list()
 
 # ---------------------------
 # Reading + chunking
 # ---------------------------
+def _read_pdf_pdfium(path: str) -> str:
+    pdf = pdfium.PdfDocument(path)
+    try:
+        parts = []
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                txt = textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+                page.close()
+            if txt.strip():
+                parts.append(txt)
+        return "\n\n".join(parts)
+    finally:
+        pdf.close()
+
 def _read_pdf(path: str) -> str:
+    if pdfium is not None:
+        try:
+            return _read_pdf_pdfium(path)
+        except Exception:
+            pass  # pypdf below copes with some files PDFium rejects
     try:
         reader = PdfReader(path)
         parts = []
@@ -179,33 +343,159 @@ def _read_text(path: str) -> str:
     with open(path, "r", encoding="utf-8", errors="ignore") as f:
         return f.read()
 
-def _chunk_text(text: str, max_chars: int = 2400, overlap: int = 250) -> List[str]:
-    text = (text or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+def _read_document(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return _read_pdf(path) if ext == ".pdf" else _read_text(path)
+
+def _extract_pool() -> Optional[ProcessPoolExecutor]:
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is None:
+            # Never fork: the parent is a threaded uvicorn process
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            try:
+                _EXTRACT_POOL = ProcessPoolExecutor(
+                    max_workers=EXTRACT_WORKERS,
+                    mp_context=multiprocessing.get_context(method),
+                )
+            except Exception as e:
+                print(f"[database_api] process pool unavailable, extracting on threads: {e}")
+                return None
+        return _EXTRACT_POOL
+
+def _drop_extract_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next build starts a fresh one."""
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is pool:
+            _EXTRACT_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+async def _read_documents(bases: List[str], skip: Optional[Callable[[str], bool]] = None) -> AsyncIterator[Tuple[str, str]]:
+    """Yield (path, text) in _iter_files order while later files are still being extracted."""
+    loop = asyncio.get_running_loop()
+    pool = _extract_pool()
+    pending: deque = deque()
+    try:
+        for path in _iter_files(bases):
+            if skip is not None and skip(path):
+                continue
+            executor = pool if path.lower().endswith(".pdf") else None  # text files: a thread is enough
+            pending.append((path, loop.run_in_executor(executor, _read_document, path)))
+            if len(pending) >= 2 * EXTRACT_WORKERS:
+                done_path, fut = pending.popleft()
+                yield done_path, await fut
+        while pending:
+            done_path, fut = pending.popleft()
+            yield done_path, await fut
+    except BrokenProcessPool:
+        # A worker died (PDFium crash, OOM kill): fail this build only
+        if pool is not None:
+            _drop_extract_pool(pool)
+        for _, fut in pending:
+            fut.cancel()
+        print("[database_api] extraction worker died; build aborted")
+        raise HTTPException(status_code=500, detail="Document extraction crashed; try the build again")
+
+def _chunk_text(text: str) -> List[str]:
+    text = text or ""
+    if "\r" in text:  # most extracted text has none; skip both copies then
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = text.strip()
     if not text:
         return []
-    chunks = []
-    i = 0
-    n = len(text)
-    while i < n:
-        j = min(n, i + max_chars)
-        chunk = text[i:j].strip()
-        if chunk:
-            chunks.append(chunk)
-        if j >= n:
-            break
-        i = max(0, j - overlap)
-    return chunks
+    enc = _chunk_encoding()
+    if enc is not None:
+        return _chunk_tokens(text, enc)
+    # Windows start every `stride` chars until one reaches the end of the text
+    stride = max(1, CHUNK_CHARS - CHUNK_OVERLAP_CHARS)
+    last = max(0, len(text) - CHUNK_CHARS)
+    chunks = [text[i:i + CHUNK_CHARS].strip() for i in range(0, last + stride, stride)]
+    return [c for c in chunks if c]
+
+_CHUNK_ENC = None
+_CHUNK_ENC_FAILED = False
+_CHUNK_ENC_LOCK = threading.Lock()
+
+
+def _chunk_encoding():
+    """cl100k_base when CHUNK_MODE is "tokens", else None (character windows)."""
+    global _CHUNK_ENC, _CHUNK_ENC_FAILED
+    if CHUNK_MODE != "tokens" or _CHUNK_ENC_FAILED:
+        return None
+    if _CHUNK_ENC is not None:
+        return _CHUNK_ENC
+    with _CHUNK_ENC_LOCK:
+        if _CHUNK_ENC is None and not _CHUNK_ENC_FAILED:
+            try:
+                if tiktoken is None:
+                    raise RuntimeError("tiktoken is not installed")
+                _CHUNK_ENC = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                _CHUNK_ENC_FAILED = True
+                print(f"[DB] token chunking unavailable ({e}); using character windows")
+    return _CHUNK_ENC
+
+
+def _chunk_tokens(text: str, enc) -> List[str]:
+    """Tokenize once, then decode CHUNK_TOKENS-token windows every CHUNK_STRIDE tokens."""
+    toks = enc.encode(text, disallowed_special=())
+    if len(toks) <= CHUNK_TOKENS:
+        return [text]
+    last = len(toks) - CHUNK_TOKENS
+    chunks = [
+        enc.decode(toks[i:i + CHUNK_TOKENS]).strip()
+        for i in range(0, last + CHUNK_STRIDE, CHUNK_STRIDE)
+    ]
+    return [c for c in chunks if c]
+
+INDEXABLE_EXTS = frozenset({".pdf", ".txt", ".md"})
+
+def _manifest_stale(manifest: Dict[str, Any], bases: List[str], store_chunks: int) -> bool:
+    """
+    True when appending to the store would leave stale chunks behind: a file
+    from the last build changed or is gone, or the store no longer holds the
+    chunks the manifest describes (e.g. it was emptied by an embed-model change).
+    """
+    current: Dict[str, List[int]] = {}
+    for path in _iter_files(bases):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        current[os.path.relpath(path, DOCUMENTS_DIR).replace("\\", "/")] = [st.st_mtime_ns, st.st_size]
+
+    expected = 0
+    for rel, prev in manifest.items():
+        if not isinstance(prev, list) or len(prev) < 3 or current.get(rel) != prev[:2]:
+            return True
+        expected += int(prev[2])
+    return expected != store_chunks
+
+def _iter_files(bases: List[str]) -> Iterator[str]:
+    """Yield indexable files lazily, sorted within each directory."""
+    for base in bases:
+        for root, dirs, files in os.walk(base):
+            dirs.sort()
+            for fn in sorted(files):
+                if os.path.splitext(fn)[1].lower() in INDEXABLE_EXTS:
+                    yield os.path.join(root, fn)
 
 def _walk_tree(root: str) -> Dict[str, Any]:
-    def build(node_path: str) -> Dict[str, Any]:
-        name = os.path.basename(node_path) or "documents"
-        if os.path.isdir(node_path):
-            children = []
-            for item in sorted(os.listdir(node_path)):
-                children.append(build(os.path.join(node_path, item)))
-            return {"name": name, "type": "dir", "children": children}
-        return {"name": name, "type": "file"}
-    return build(root)
+    # scandir's DirEntry carries the d_type from readdir, so no per-child stat
+    def build_dir(name: str, dir_path: str) -> Dict[str, Any]:
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        children = [
+            build_dir(e.name, e.path) if e.is_dir() else {"name": e.name, "type": "file"}
+            for e in entries
+        ]
+        return {"name": name, "type": "dir", "children": children}
+
+    name = os.path.basename(root) or "documents"
+    if os.path.isdir(root):
+        return build_dir(name, root)
+    return {"name": name, "type": "file"}
 
 # ---------------------------
 # Azure-safe lightweight search index (no external deps)
@@ -213,16 +503,30 @@ def _walk_tree(root: str) -> Dict[str, Any]:
 _TOKEN_RE = re.compile(r"[a-zA-Z0-9_]+")
 
 def _tokenize(s: str) -> List[str]:
-    return [t.lower() for t in _TOKEN_RE.findall(s or "") if t]
+    # Lowercase once and let the compiled pattern do the split in a single C-level pass
+    return _TOKEN_RE.findall((s or "").lower())
 
-def _score_overlap(query_tokens: List[str], text_tokens: List[str]) -> float:
-    if not query_tokens or not text_tokens:
-        return 0.0
-    qset = set(query_tokens)
-    tset = set(text_tokens)
-    inter = len(qset & tset)
-    # small length-normalization so huge chunks don't always win
-    return inter / math.sqrt(max(1.0, float(len(tset))))
+# db -> (chunks.jsonl mtime_ns, [(token set, length norm, record)]) so chat scores
+# against pre-tokenized chunks instead of re-tokenizing the whole index per query
+_SIMPLE_INDEX: Dict[str, Tuple[int, List[Tuple[frozenset, float, Dict[str, Any]]]]] = {}
+
+def _load_simple_index(db_name: str) -> List[Tuple[frozenset, float, Dict[str, Any]]]:
+    try:
+        mtime = os.stat(_db_chunks_path(db_name)).st_mtime_ns
+    except OSError:
+        _SIMPLE_INDEX.pop(db_name, None)
+        return []
+    hit = _SIMPLE_INDEX.get(db_name)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    entries = []
+    for r in _read_chunks(db_name):
+        tset = frozenset(_tokenize(str(r.get("text") or "")))
+        if tset:
+            # small length-normalization so huge chunks don't always win
+            entries.append((tset, 1.0 / math.sqrt(float(len(tset))), r))
+    _SIMPLE_INDEX[db_name] = (mtime, entries)
+    return entries
 
 def _write_chunks(db_name: str, records: Iterable[Dict[str, Any]]) -> int:
     path = _db_chunks_path(db_name)
@@ -267,31 +571,70 @@ def _load_simple_stats(db_name: str) -> Dict[str, Any]:
 # ---------------------------
 # LightRAG cache (Jetson/local)
 # ---------------------------
-_RAG_CACHE: Dict[str, Tuple[Any, float]] = {}
+_RAG_CACHE: Dict[str, Tuple[Any, float, Tuple[str, str, str], Tuple]] = {}
 _RAG_CACHE_TTL_S = float(os.getenv("AURA_RAG_CACHE_TTL_S", "3600"))
+# Only taken on a miss: /stats runs in the threadpool while chat/build run on the
+# event loop, and two first calls must not both load the same store from disk
+_RAG_BUILD_LOCK = threading.Lock()
 
 def _get_rag(db_name: str):
     # Only if explicitly enabled + import exists
     if not (AURA_ENABLE_RAG and HAS_RAG):
         raise RuntimeError("RAG disabled")
 
+    # The store files are stat'ed on every call: another worker (or a copied-in
+    # store) may have replaced them since this instance loaded them
     now = time.time()
+    sig = _rag_store_sig(db_name)
     hit = _RAG_CACHE.get(db_name)
-    if hit:
-        rag, ts = hit
-        if (now - ts) < _RAG_CACHE_TTL_S:
-            return rag
+    if hit and (now - hit[1]) < _RAG_CACHE_TTL_S and hit[3] == sig:
+        return hit[0]
+
+    with _RAG_BUILD_LOCK:
+        hit = _RAG_CACHE.get(db_name)
+        if hit and (now - hit[1]) < _RAG_CACHE_TTL_S and hit[3] == sig:
+            return hit[0]  # another caller finished it while we waited
+        return _load_rag(db_name, hit, now, sig)
+
+def _rag_key(cfg: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        str(cfg.get("llm_model") or DEFAULT_LLM),
+        str(cfg.get("embed_model") or DEFAULT_EMBED),
+        str(cfg.get("ollama_url") or OLLAMA_URL),
+    )
+
+def _rag_store_sig(db_name: str) -> Tuple:
+    sig = []
+    for name in ("meta.json", "embeddings.npy"):
+        try:
+            st = os.stat(os.path.join(_db_workdir(db_name), name))
+            sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+def _load_rag(db_name: str, hit: Optional[Tuple[Any, float, Tuple[str, str, str], Tuple]], now: float, sig: Tuple):
+    key = _rag_key(_load_db_config(db_name))
+    # TTL expiry only re-validates the config; keep the loaded index + client
+    # if neither it nor the store on disk changed
+    if hit and hit[2] == key and hit[3] == sig:
+        _RAG_CACHE[db_name] = (hit[0], now, key, sig)
+        return hit[0]
 
-    cfg = _load_db_config(db_name)
     rag = LightRAG(
         working_dir=_db_workdir(db_name),
-        llm_model_name=str(cfg.get("llm_model") or DEFAULT_LLM),
-        embed_model_name=str(cfg.get("embed_model") or DEFAULT_EMBED),
-        ollama_base_url=str(cfg.get("ollama_url") or OLLAMA_URL),
+        llm_model_name=key[0],
+        embed_model_name=key[1],
+        ollama_base_url=key[2],
     )
-    _RAG_CACHE[db_name] = (rag, now)
+    _RAG_CACHE[db_name] = (rag, now, key, sig)
     return rag
 
+def _keep_rag(db_name: str, rag) -> None:
+    """After a build flushed `rag` to disk, keep it cached against the new store files."""
+    with _RAG_BUILD_LOCK:
+        _RAG_CACHE[db_name] = (rag, time.time(), _rag_key(_load_db_config(db_name)), _rag_store_sig(db_name))
+
 def _invalidate_rag(db_name: str):
     _RAG_CACHE.pop(db_name, None)
 
@@ -339,19 +682,26 @@ async def sync_db_up(db_name: str, x_device_secret: str = Header(default=None, a
     os.makedirs(db_dir, exist_ok=True)
     
     saved = []
+    total = 0
     for f in files:
-        if f.filename in ["faiss.index", "embeddings.npy", "meta.json", "db.json"]:
+        if f.filename in VECTOR_DB_FILES:
             out = os.path.join(db_dir, f.filename)
-            with open(out, "wb") as w:
-                w.write(await f.read())
+            total += await _save_upload(f, out)
             saved.append(f.filename)
-            
-    return {"ok": True, "saved": saved}
+
+    if saved:
+        try:
+            os.remove(_db_manifest_path(db_name))  # describes the store that was just replaced
+        except FileNotFoundError:
+            pass
+    _invalidate_rag(db_name)
+    _invalidate_db_list()
+    return {"ok": True, "saved": saved, "bytes": total}
 
 @router.get("/api/databases/{db_name}/sync_down/{filename}")
 def sync_db_down(db_name: str, filename: str, x_device_secret: str = Header(default=None, alias="X-Device-Secret")):
     # Verify device secret
-    if filename not in ["faiss.index", "embeddings.npy", "meta.json", "db.json"]:
+    if filename not in VECTOR_DB_FILES:
         raise HTTPException(status_code=400, detail="Invalid vector file")
         
     full_path = os.path.join(_db_dir(db_name), filename)
@@ -381,15 +731,20 @@ async def documents_upload(request: Request, path: str = "", files: List[UploadF
     owner_email = _email(payload)
     owner_role = _role(payload)
 
-    for f in files:
-        name = os.path.basename(f.filename or "file")
+    # Validate every name up front (one compiled-regex check each) so a bad
+    # file can't leave a half-applied batch behind
+    names = [os.path.basename((f.filename or "file").replace("\\", "/")) for f in files]
+    for name in names:
+        if not name or _UPLOAD_NAME_BAD.search(name):
+            raise HTTPException(status_code=400, detail=f"Invalid filename: {name!r}")
+
+    for f, name in zip(files, names):
         out = os.path.join(dest_dir, name)
-        with open(out, "wb") as w:
-            w.write(await f.read())
+        await _save_upload(f, out)
         saved += 1
 
         rel_source = os.path.relpath(out, DOCUMENTS_DIR).replace("\\", "/")
-        doc_set_owner(rel_source, owner_email, owner_role)
+        await asyncio.to_thread(_set_owner_if_present, out, rel_source, owner_email, owner_role)
 
     return {"ok": True, "saved": saved, "path": path}
 
@@ -406,8 +761,12 @@ def documents_delete(request: Request, path: str):
         return {"ok": True, "deleted": path}
 
     require_owner_or_admin(request, rel_norm)
-    os.remove(full)
-    doc_delete_owner(rel_norm)
+    (lk,) = _path_locks(rel_norm)
+    with lk:
+        if not os.path.exists(full):
+            raise HTTPException(status_code=404, detail="Not found")
+        os.remove(full)
+        doc_delete_owner(rel_norm)
     return {"ok": True, "deleted": path}
 
 @router.post("/api/documents/move")
@@ -428,24 +787,57 @@ def documents_move(req: MoveRequest, request: Request):
 
     require_owner_or_admin(request, src_rel)
     os.makedirs(os.path.dirname(dst), exist_ok=True)
-    shutil.move(src, dst)
-    doc_move_owner(src_rel, dst_rel)
+    # Lock both ends in a stable order so opposite moves can't deadlock
+    locks = _path_locks(src_rel, dst_rel)
+    for lk in locks:
+        lk.acquire()
+    try:
+        if not os.path.exists(src):
+            raise HTTPException(status_code=404, detail="Source not found")
+        _move_file(src, dst)
+        doc_move_owner(src_rel, dst_rel)
+    finally:
+        for lk in reversed(locks):
+            lk.release()
     return {"ok": True, "src": req.src, "dst": req.dst}
 
 # ---------------------------
 # Endpoints: Databases
 # ---------------------------
+_DB_LIST_CACHE: Dict[str, Any] = {"mtime": -1, "dbs": [], "gen": 0}
+_DB_LIST_LOCK = threading.Lock()
+
+def _invalidate_db_list():
+    with _DB_LIST_LOCK:
+        _DB_LIST_CACHE["mtime"] = -1
+        _DB_LIST_CACHE["gen"] += 1
+
 @router.get("/api/databases")
 def list_databases(request: Request):
     require_any_user(request)
+
+    # Root mtime changes whenever a DB folder is added/removed; db.json writes
+    # invalidate explicitly (_save_db_config, sync_up).
+    gen = _DB_LIST_CACHE["gen"]
+    mtime = os.stat(RAG_ROOT_DIR).st_mtime_ns
+    if mtime == _DB_LIST_CACHE["mtime"]:
+        return {"databases": list(_DB_LIST_CACHE["dbs"])}
+
     out = []
-    for name in sorted(os.listdir(RAG_ROOT_DIR)):
-        p = os.path.join(RAG_ROOT_DIR, name)
-        if not os.path.isdir(p):
-            continue
-        if os.path.exists(_db_config_path(name)):
-            out.append(name)
-    return {"databases": out}
+    with os.scandir(RAG_ROOT_DIR) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if os.path.exists(os.path.join(entry.path, "db.json")):
+                out.append(entry.name)
+    out.sort()
+
+    with _DB_LIST_LOCK:
+        # An invalidation during the scan means it may have missed a db.json
+        if gen == _DB_LIST_CACHE["gen"]:
+            _DB_LIST_CACHE["mtime"] = mtime
+            _DB_LIST_CACHE["dbs"] = out
+    return {"databases": list(out)}
 
 @router.post("/api/databases/create")
 def create_database(req: CreateDBRequest, request: Request):
@@ -512,46 +904,108 @@ async def build_database(req: BuildDBRequest, request: Request):
     workdir = _db_workdir(req.name)
     os.makedirs(workdir, exist_ok=True)
 
-    # Collect indexable files
-    all_files: List[str] = []
+    bases: List[str] = []
     for folder in folders:
         base = _safe_join(DOCUMENTS_DIR, folder)
         if not os.path.exists(base) or not os.path.isdir(base):
             raise HTTPException(status_code=400, detail=f"Folder not found: {folder}")
+        bases.append(base)
 
-        for root, _, files in os.walk(base):
-            for fn in files:
-                ext = os.path.splitext(fn)[1].lower()
-                if ext in [".pdf", ".txt", ".md"]:
-                    all_files.append(os.path.join(root, fn))
-
-    if not all_files:
+    # Only walk far enough to prove there is something to index
+    if next(_iter_files(bases), None) is None:
         raise HTTPException(status_code=400, detail="No indexable files (.pdf/.txt/.md) found")
 
     # If LightRAG is enabled and available, use it (Jetson/local)
     if AURA_ENABLE_RAG and HAS_RAG:
         try:
             rag = _get_rag(req.name)
-            if req.force:
-                rag.reset()
 
             inserted_chunks = 0
             skipped_files = 0
-
-            for path in sorted(all_files):
-                ext = os.path.splitext(path)[1].lower()
-                text = _read_pdf(path) if ext == ".pdf" else _read_text(path)
-                if not text.strip():
-                    skipped_files += 1
-                    continue
-
-                rel_source = os.path.relpath(path, DOCUMENTS_DIR).replace("\\", "/")
-                header = f"[SOURCE FILE: {rel_source}]\n\n"
-                chunks = _chunk_text(header + text)
-
-                for c in chunks:
-                    await rag.ainsert(c, meta={"source": rel_source})
-                    inserted_chunks += 1
+            unchanged_files = 0
+            files_found = 0
+
+            # Files whose (mtime, size) match the last build's manifest are already
+            # indexed; a non-force build only extracts and embeds the rest
+            old_manifest = {} if req.force else _load_manifest(req.name)
+            if old_manifest and _manifest_stale(old_manifest, bases, rag.stats()["chunk_count"]):
+                old_manifest = {}
+            if not old_manifest:
+                # Full rebuild; reset() keeps the old vectors by content hash,
+                # so text that didn't change isn't embedded again
+                rag.reset()
+            manifest: Dict[str, List[int]] = {}
+            sigs: Dict[str, List[int]] = {}
+
+            def unchanged(path: str) -> bool:
+                nonlocal files_found, unchanged_files
+                rel = os.path.relpath(path, DOCUMENTS_DIR).replace("\\", "/")
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    return True  # vanished mid-walk: nothing to index
+                sigs[path] = [st.st_mtime_ns, st.st_size]
+                prev = old_manifest.get(rel)
+                if isinstance(prev, list) and prev[:2] == sigs[path]:
+                    manifest[rel] = prev
+                    files_found += 1
+                    unchanged_files += 1
+                    return True
+                return False
+
+            # Producer extracts one file at a time (off the event loop) and feeds a bounded
+            # queue with batches of ~BUILD_BATCH_CHUNKS chunks pooled across files;
+            # consumers embed each batch with one ainsert_many so extraction overlaps
+            # with Ollama.
+            q: asyncio.Queue = asyncio.Queue(maxsize=BUILD_QUEUE_MAX)
+
+            async def produce():
+                nonlocal skipped_files, files_found
+                chunks: List[str] = []
+                metas: List[Dict[str, Any]] = []
+                try:
+                    async for path, text in _read_documents(bases, skip=unchanged):
+                        files_found += 1
+                        rel_source = os.path.relpath(path, DOCUMENTS_DIR).replace("\\", "/")
+                        if not text.strip():
+                            skipped_files += 1
+                            manifest[rel_source] = sigs[path] + [0]
+                            continue
+
+                        header = f"[SOURCE FILE: {rel_source}]\n\n"
+                        file_chunks = _chunk_text(header + text)
+                        manifest[rel_source] = sigs[path] + [len(file_chunks)]
+                        chunks.extend(file_chunks)
+                        metas.extend({"source": rel_source} for _ in file_chunks)
+                        if len(chunks) >= BUILD_BATCH_CHUNKS:
+                            await q.put((chunks, metas))
+                            chunks, metas = [], []
+                    if chunks:
+                        await q.put((chunks, metas))
+                finally:
+                    for _ in range(BUILD_WORKERS):
+                        await q.put(None)
+
+            async def consume():
+                nonlocal inserted_chunks
+                while True:
+                    item = await q.get()
+                    if item is None:
+                        break
+                    chunks, metas = item
+                    await rag.ainsert_many(chunks, metas)
+                    inserted_chunks += len(chunks)
+
+            producer = asyncio.create_task(produce())
+            consumers = [asyncio.create_task(consume()) for _ in range(BUILD_WORKERS)]
+            try:
+                await asyncio.gather(*consumers)
+                await producer
+            finally:
+                producer.cancel()
+                for t in consumers:
+                    t.cancel()
+                await asyncio.gather(producer, *consumers, return_exceptions=True)
 
             cfg["folders"] = folders
             cfg["engine"] = "lightrag"
@@ -559,18 +1013,19 @@ async def build_database(req: BuildDBRequest, request: Request):
 
             try:
                 rag.flush()
+                _keep_rag(req.name, rag)
+                _save_manifest(req.name, manifest)  # only once the store it describes is on disk
             except Exception:
                 pass
 
-            _invalidate_rag(req.name)
-
             return {
                 "ok": True,
                 "status": "Database built",
                 "db": req.name,
                 "folders": folders,
-                "files_found": len(all_files),
+                "files_found": files_found,
                 "skipped_files": skipped_files,
+                "unchanged_files": unchanged_files,
                 "inserted_chunks": inserted_chunks,
                 "stats": rag.stats(),
                 "engine": "lightrag",
@@ -583,11 +1038,11 @@ async def build_database(req: BuildDBRequest, request: Request):
     # Azure-safe SIMPLE build (no Ollama, no extra deps)
     inserted_chunks = 0
     skipped_files = 0
+    files_found = 0
     records: List[Dict[str, Any]] = []
 
-    for path in sorted(all_files):
-        ext = os.path.splitext(path)[1].lower()
-        text = _read_pdf(path) if ext == ".pdf" else _read_text(path)
+    async for path, text in _read_documents(bases):
+        files_found += 1
 
         if not (text or "").strip():
             skipped_files += 1
@@ -626,7 +1081,7 @@ async def build_database(req: BuildDBRequest, request: Request):
     simple_stats = {
         "mode": "simple",
         "chunk_count": chunk_count,
-        "files_found": len(all_files),
+        "files_found": files_found,
         "skipped_files": skipped_files,
         "built_ts": int(time.time()),
     }
@@ -637,7 +1092,7 @@ async def build_database(req: BuildDBRequest, request: Request):
         "status": "Database built (simple)",
         "db": req.name,
         "folders": folders,
-        "files_found": len(all_files),
+        "files_found": files_found,
         "skipped_files": skipped_files,
         "inserted_chunks": chunk_count,
         "stats": {"chunk_count": chunk_count, "vdb_path": _db_dir(req.name), "engine": "simple"},
@@ -664,21 +1119,20 @@ async def database_chat(req: ChatRequest, request: Request):
             pass
 
     # SIMPLE chat: retrieve top chunks by token overlap and return a structured answer
-    chunks = _read_chunks(req.db)
-    if not chunks:
+    index = _load_simple_index(req.db)
+    if not index:
         raise HTTPException(status_code=400, detail="Database has no built index yet. Click Build first.")
 
     q = (req.query or "").strip()
     if not q:
         raise HTTPException(status_code=400, detail="Query is empty")
 
-    qtok = _tokenize(q)
+    qset = frozenset(_tokenize(q))
     scored: List[Tuple[float, Dict[str, Any]]] = []
-    for r in chunks:
-        txt = str(r.get("text") or "")
-        score = _score_overlap(qtok, _tokenize(txt))
-        if score > 0:
-            scored.append((score, r))
+    for tset, norm, r in index:
+        inter = len(qset & tset)
+        if inter:
+            scored.append((inter * norm, r))
 
     scored.sort(key=lambda x: x[0], reverse=True)
     top = scored[:5] if scored else []
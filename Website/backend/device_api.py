@@ -1,13 +1,16 @@
 import os
 import json
 import time
+import hashlib
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Response
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+from security import require_auth, get_client_ip
+
 # Load Website/.env if it exists
 env_path = Path(__file__).resolve().parents[1] / ".env"
 if env_path.exists():
@@ -85,13 +88,6 @@ def _now() -> int:
     return int(time.time())
 
 
-def _client_ip(request: Request) -> str:
-    xff = request.headers.get("x-forwarded-for", "")
-    if xff:
-        return xff.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
-
-
 def _require_device_secret(request: Request) -> None:
     if not DEVICE_SHARED_SECRET:
         raise HTTPException(status_code=500, detail="Server missing DEVICE_SHARED_SECRET")
@@ -167,7 +163,7 @@ def device_register(body: DeviceRegisterReq, request: Request):
         "local_ip": (body.local_ip or "").strip(),
         "last_register_at": _now(),
         "last_seen_at": _now(),
-        "last_seen_ip": _client_ip(request),
+        "last_seen_ip": get_client_ip(request),
         "online": True,
     })
 
@@ -204,7 +200,7 @@ def device_heartbeat(body: DeviceHeartbeatReq, request: Request):
         "vector_db_ready": body.vector_db_ready,
         "camera_ready": body.camera_ready,
         "last_seen_at": _now(),
-        "last_seen_ip": _client_ip(request),
+        "last_seen_ip": get_client_ip(request),
         "online": True,
     })
 
@@ -248,7 +244,7 @@ def device_status(body: DeviceStatusReq, request: Request):
     }
 
     rec["last_seen_at"] = _now()
-    rec["last_seen_ip"] = _client_ip(request)
+    rec["last_seen_ip"] = get_client_ip(request)
     rec["online"] = True
 
     _write_devices(data)
@@ -275,7 +271,7 @@ def device_log(body: DeviceLogReq, request: Request):
         "event": body.event.strip(),
         "message": body.message.strip(),
         "meta": body.meta or {},
-        "ip": _client_ip(request),
+        "ip": get_client_ip(request),
     }
 
     _append_jsonl(DEVICE_LOGS_FILE, entry)
@@ -295,6 +291,23 @@ def device_log(body: DeviceLogReq, request: Request):
     }
 
 
+# Everything in the /config reply except device_id is fixed at import, so it is
+# encoded once and the per-device id is appended to the pre-built body
+_DEVICE_CONFIG_HEAD = json.dumps(
+    {
+        "ok": True,
+        "poll_seconds": DEVICE_DEFAULT_POLL_SECONDS,
+        "heartbeat_seconds": DEVICE_DEFAULT_HEARTBEAT_SECONDS,
+        "status_seconds": DEVICE_DEFAULT_STATUS_SECONDS,
+        "camera_mode": "reserved",
+        "commands_enabled": True,
+        "ollama_enabled": False,
+        "vector_sync_enabled": False,
+    },
+    separators=(",", ":"),
+)[:-1].encode("utf-8") + b',"device_id":'
+
+
 @router.get("/config")
 def device_config(request: Request, device_id: str):
     _require_device_secret(request)
@@ -310,23 +323,16 @@ def device_config(request: Request, device_id: str):
     if not isinstance(rec, dict):
         raise HTTPException(status_code=404, detail="Unknown device")
 
-    return {
-        "ok": True,
-        "device_id": device_id,
-        "poll_seconds": DEVICE_DEFAULT_POLL_SECONDS,
-        "heartbeat_seconds": DEVICE_DEFAULT_HEARTBEAT_SECONDS,
-        "status_seconds": DEVICE_DEFAULT_STATUS_SECONDS,
-        "camera_mode": "reserved",
-        "commands_enabled": True,
-        "ollama_enabled": False,
-        "vector_sync_enabled": False,
-    }
+    body = _DEVICE_CONFIG_HEAD + json.dumps(device_id).encode("utf-8") + b"}"
+    # The config only changes on redeploy: devices revalidate with If-None-Match
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @router.get("/admin/list")
 def admin_list_devices(request: Request):
-    from security import require_auth
-
     payload = require_auth(request)
     if payload.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
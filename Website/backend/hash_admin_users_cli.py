@@ -1,9 +1,32 @@
 # backend/hash_admin_users_cli.py
+import os
 import json
 import getpass
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 from config import ADMIN_USERS_PATH, ensure_storage_layout
-from hash_passwords import hash_password
+from hash_passwords import ARGON2_PREFIX, hash_password
+
+def _load(path):
+    raw = path.read_bytes()
+    return orjson.loads(raw) if orjson else json.loads(raw.decode("utf-8"))
+
+def _save(path, data) -> None:
+    # Serialize once, write to a temp file and swap it in
+    if orjson:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        raw = (json.dumps(data, indent=2) + "\n").encode("utf-8")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+
+def _scheme(stored: str) -> str:
+    return "argon2id" if stored.startswith(ARGON2_PREFIX) else "PBKDF2"
 
 def main():
     ensure_storage_layout()
@@ -12,8 +35,7 @@ def main():
     if not ADMIN_USERS_PATH.exists():
         ADMIN_USERS_PATH.write_text('{"admins":[]}\n', encoding="utf-8")
 
-    with open(ADMIN_USERS_PATH, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = _load(ADMIN_USERS_PATH)
 
     admins = data.get("admins", [])
     if not isinstance(admins, list):
@@ -26,8 +48,7 @@ def main():
         admins.append({"email": email, "password_hash": hash_password(pw)})
         data["admins"] = admins
 
-        with open(ADMIN_USERS_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        _save(ADMIN_USERS_PATH, data)
         print(f"\n✅ Created first admin in {ADMIN_USERS_PATH}\n")
         return
 
@@ -41,10 +62,10 @@ def main():
         if "password" in admin:
             admin.pop("password", None)
 
-    with open(ADMIN_USERS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    _save(ADMIN_USERS_PATH, data)
 
-    print(f"\n✅ Saved PBKDF2 password hashes to {ADMIN_USERS_PATH}\n")
+    scheme = _scheme(admins[-1]["password_hash"])
+    print(f"\n✅ Saved {scheme} password hashes to {ADMIN_USERS_PATH}\n")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,8 +3,30 @@ import os
 import base64
 import hashlib
 import hmac
+from functools import lru_cache
+from typing import Optional, Tuple
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except Exception:
+    PasswordHasher = None
+
+try:
+    from fastpbkdf2 import pbkdf2_hmac as _pbkdf2_hmac
+    _FAST_PBKDF2 = True
+except Exception:
+    _pbkdf2_hmac = hashlib.pbkdf2_hmac
+    _FAST_PBKDF2 = False
 
 ALGO_PREFIX = "pbkdf2_sha256"
+# fastpbkdf2 is several times quicker than hashlib, so spend that on more iterations
+PBKDF2_ITERATIONS = 600_000 if _FAST_PBKDF2 else 200_000
+ARGON2_PREFIX = "$argon2"
+
+# argon2id is preferred when argon2-cffi is installed; PBKDF2 hashes still verify
+# and are flagged by needs_rehash() so callers can migrate them on next login.
+_ARGON2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2) if PasswordHasher else None
 
 def _b64encode_nopad(b: bytes) -> str:
     return base64.urlsafe_b64encode(b).decode("utf-8").rstrip("=")
@@ -14,21 +36,42 @@ def _b64decode_nopad(s: str) -> bytes:
     pad = "=" * ((4 - (len(s) % 4)) % 4)
     return base64.urlsafe_b64decode((s + pad).encode("utf-8"))
 
-def hash_password(password: str, iterations: int = 200_000) -> str:
+@lru_cache(maxsize=4096)
+def _parse_stored(stored: str) -> Optional[Tuple[int, bytes, bytes]]:
+    """Split + base64-decode a PBKDF2 hash once; None if the format is wrong."""
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] != ALGO_PREFIX:
+        return None
+    try:
+        iterations = int(parts[1])
+        salt = _b64decode_nopad(parts[2])
+        expected = _b64decode_nopad(parts[3])
+    except Exception:
+        return None
+    # sha256 output; anything else can never match, so skip the KDF
+    if iterations <= 0 or len(expected) != 32:
+        return None
+    return iterations, salt, expected
+
+def hash_password(password: str, iterations: int = PBKDF2_ITERATIONS) -> str:
     """
     Returns:
+    $argon2id$... when argon2-cffi is available, otherwise
     pbkdf2_sha256$<iterations>$<salt_b64>$<hash_b64>
     """
     if not isinstance(password, str) or not password:
         raise ValueError("password must be a non-empty string")
 
+    if _ARGON2 is not None:
+        return _ARGON2.hash(password)
+
     salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    dk = _pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     return f"{ALGO_PREFIX}${iterations}${_b64encode_nopad(salt)}${_b64encode_nopad(dk)}"
 
 def verify_password(password: str, stored: str) -> bool:
     """
-    Verifies a plaintext password against stored PBKDF2 hash.
+    Verifies a plaintext password against stored argon2 / PBKDF2 hash.
     Uses constant-time compare.
     """
     try:
@@ -37,19 +80,31 @@ def verify_password(password: str, stored: str) -> bool:
         if not isinstance(stored, str) or not stored:
             return False
 
-        parts = stored.split("$")
-        if len(parts) != 4:
-            return False
+        if stored.startswith(ARGON2_PREFIX):
+            if _ARGON2 is None:
+                return False
+            try:
+                return _ARGON2.verify(stored, password)
+            except (VerificationError, InvalidHashError):
+                return False
 
-        algo, iter_s, salt_b64, hash_b64 = parts
-        if algo != ALGO_PREFIX:
+        parsed = _parse_stored(stored)
+        if parsed is None:
             return False
+        iterations, salt, expected = parsed
 
-        iterations = int(iter_s)
-        salt = _b64decode_nopad(salt_b64)
-        expected = _b64decode_nopad(hash_b64)
-
-        dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        dk = _pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
         return hmac.compare_digest(dk, expected)
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+def needs_rehash(stored: str) -> bool:
+    """True when a stored hash should be upgraded to the current preferred scheme."""
+    if _ARGON2 is None or not isinstance(stored, str):
+        return False
+    if not stored.startswith(ARGON2_PREFIX):
+        return True
+    try:
+        return _ARGON2.check_needs_rehash(stored)
+    except Exception:
+        return False
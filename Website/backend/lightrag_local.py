@@ -2,17 +2,43 @@
 from __future__ import annotations
 
 import os
+import re
 import json
 import time
 import asyncio
+import hashlib
+import threading
+import http.client
+from array import array
+from urllib.parse import urlsplit
+from collections import OrderedDict
+from functools import lru_cache
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+import urllib.error
 import urllib.request
 
-import faiss
-from rank_bm25 import BM25Okapi
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import simsimd
+except Exception:
+    simsimd = None
+
+try:
+    import faiss
+except Exception:
+    faiss = None  # exact search falls back to one NumPy matmul over the embedding matrix
 
 # ---------------------------
 # Tunables (env override)
@@ -24,13 +50,112 @@ AURA_TEMPERATURE = float(os.getenv("AURA_TEMPERATURE", "0.2"))
 AURA_NUM_THREAD = int(os.getenv("AURA_NUM_THREAD", "0"))                 # 0 = let ollama decide
 AURA_KEEP_ALIVE = os.getenv("AURA_KEEP_ALIVE", "10m")                    # keep model warm
 
-# RAG context size (this matters a LOT for speed)
-MAX_CTX_CHARS = int(os.getenv("AURA_MAX_CTX_CHARS", "6000"))
+# RAG context size (this matters a LOT for speed). Context is packed by tokens to
+# fill num_ctx minus the answer and prompt overhead; MAX_CTX_CHARS > 0 adds a hard
+# character cap on top.
+MAX_CTX_CHARS = int(os.getenv("AURA_MAX_CTX_CHARS", "0"))
+CTX_RESERVED_TOKENS = int(os.getenv("AURA_CTX_RESERVED_TOKENS", "64"))  # chat template / safety margin
 # Retrieval
 DEFAULT_TOP_K = int(os.getenv("AURA_TOP_K", "4"))
 
-# BM25 rebuild cadence (speeds up indexing/build)
-BM25_REBUILD_EVERY = int(os.getenv("AURA_BM25_REBUILD_EVERY", "50"))
+# faiss index type: "flat" (exact) | "sq8" (8-bit scalar-quantized scan, 4x less
+# memory traffic per query; trained once the store has SQ8_MIN_TRAIN rows) |
+# "hnsw" (graph ANN, ~log N hops per query instead of a full scan)
+VECTOR_INDEX = os.getenv("AURA_VECTOR_INDEX", "flat").strip().lower()
+SQ8_MIN_TRAIN = 256
+HNSW_M = int(os.getenv("AURA_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = int(os.getenv("AURA_HNSW_EF_SEARCH", "64"))
+
+# Texts per /api/embed request in ainsert_many
+EMBED_BATCH = int(os.getenv("AURA_EMBED_BATCH", "64"))
+# Ollama requests in flight per client; a CPU-bound server only slows down when
+# more threads pile onto it (raise these for a GPU server)
+EMBED_CONCURRENCY = max(1, int(os.getenv("AURA_EMBED_CONCURRENCY", "2")))
+GENERATE_CONCURRENCY = max(1, int(os.getenv("AURA_GENERATE_CONCURRENCY", "1")))
+
+# Query-embedding LRU (keyed by normalized query text)
+EMBED_CACHE_MAX = int(os.getenv("AURA_EMBED_CACHE_MAX", "1024"))
+
+# Answer cache for repeated queries (cleared whenever the store changes)
+QUERY_CACHE_TTL_S = float(os.getenv("AURA_QUERY_CACHE_TTL_S", "600"))
+QUERY_CACHE_MAX = int(os.getenv("AURA_QUERY_CACHE_MAX", "256"))
+# Reuse a cached answer for a differently-worded question whose embedding is at
+# least this similar (vector/hybrid modes only; 0 disables)
+SEMANTIC_CACHE_THRESH = float(os.getenv("AURA_SEMANTIC_CACHE_THRESH", "0.95"))
+
+
+# Built once; the system prompt stays byte-identical across requests
+_SYSTEM_PROMPT = (
+    "You are AURA. Answer ONLY using the provided context. "
+    "If the context doesn't contain the answer, say you don't have enough information."
+)
+_PROMPT_HEAD = "CONTEXT:\n"
+_PROMPT_MID = "\n\nQUESTION:\n"
+_PROMPT_TAIL = "\n\nANSWER:"
+_CTX_SEP = "\n\n---\n\n"
+_CTX_TRUNCATED = "\n\n[...context truncated...]"
+
+
+_TOKENIZER = None
+_TOKENIZER_FAILED = False
+_TOKENIZER_LOCK = threading.Lock()
+
+
+def _tokenizer():
+    """cl100k_base, loaded on first use (it may be downloaded); None if unavailable."""
+    global _TOKENIZER, _TOKENIZER_FAILED
+    if _TOKENIZER is not None or _TOKENIZER_FAILED:
+        return _TOKENIZER
+    with _TOKENIZER_LOCK:
+        if _TOKENIZER is None and not _TOKENIZER_FAILED:
+            try:
+                if tiktoken is None:
+                    raise RuntimeError("tiktoken is not installed")
+                _TOKENIZER = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                _TOKENIZER_FAILED = True
+                print(f"[RAG] tokenizer unavailable ({e}); estimating 4 chars/token")
+    return _TOKENIZER
+
+
+@lru_cache(maxsize=4096)
+def _count_tokens(s: str) -> int:
+    enc = _tokenizer()
+    if enc is not None:
+        return len(enc.encode(s, disallowed_special=()))
+    return (len(s) + 3) // 4  # ~4 chars/token for English prose
+
+
+def _truncate_tokens(s: str, n: int) -> str:
+    if n <= 0:
+        return ""
+    enc = _tokenizer()
+    if enc is not None:
+        return enc.decode(enc.encode(s, disallowed_special=())[:n])
+    return s[: n * 4]
+
+
+@lru_cache(maxsize=1)
+def _prompt_fixed_tokens() -> int:
+    return sum(_count_tokens(s) for s in (_SYSTEM_PROMPT, _PROMPT_HEAD, _PROMPT_MID, _PROMPT_TAIL))
+
+
+def _pack_context(parts: List[str], budget: int) -> str:
+    """Join whole chunks (best first) until the token budget is spent."""
+    out: List[str] = []
+    used = 0
+    sep = _count_tokens(_CTX_SEP)
+    for p in parts:
+        cost = _count_tokens(p) + (sep if out else 0)
+        if used + cost > budget:
+            if not out:
+                # Always keep the best chunk, cut to whatever fits
+                out.append(_truncate_tokens(p, budget))
+            return _CTX_SEP.join(out) + _CTX_TRUNCATED
+        out.append(p)
+        used += cost
+    return _CTX_SEP.join(out)
 
 
 @dataclass
@@ -49,8 +174,9 @@ def _safe_mkdir(path: str):
 
 def _load_json(path: str, default):
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson else json.loads(raw.decode("utf-8"))
     except Exception:
         return default
 
@@ -58,63 +184,248 @@ def _load_json(path: str, default):
 def _save_json(path: str, obj):
     _safe_mkdir(os.path.dirname(path))
     tmp = f"{path}.tmp"
-    data = json.dumps(obj, ensure_ascii=False, indent=2)
-    with open(tmp, "w", encoding="utf-8") as f:
+    # Compact, not indented: this file is rewritten on every flush() and only read back by us
+    if orjson:
+        data = orjson.dumps(obj)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with open(tmp, "wb") as f:
         f.write(data)
     os.replace(tmp, path)
 
 
+def _save_npy(path: str, arr: np.ndarray):
+    # Write-then-rename: the current matrix may be a memmap of `path` itself
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+
+
 def _normalize(v: np.ndarray) -> np.ndarray:
     norm = np.linalg.norm(v) + 1e-12
-    return (v / norm).astype(np.float32)
+    return (v / norm).astype(np.float32, copy=False)
+
+
+def _normalize_rows(m: np.ndarray) -> np.ndarray:
+    """Row-wise _normalize for a (N, D) float32 batch, in one pass."""
+    m /= np.linalg.norm(m, axis=1, keepdims=True) + 1e-12
+    return m
+
+
+def _content_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+# Runs of alphanumerics (\w minus underscore), same split as str.isalnum() per char
+_TOKEN_RE = re.compile(r"[^\W_]+")
 
 
 def _tokenize(s: str) -> List[str]:
-    s = (s or "").lower()
-    out: List[str] = []
-    word: List[str] = []
-    for ch in s:
-        if ch.isalnum():
-            word.append(ch)
-        else:
-            if word:
-                out.append("".join(word))
-                word = []
-    if word:
-        out.append("".join(word))
-    return out
+    return _TOKEN_RE.findall((s or "").lower())
+
+
+class _BM25Index:
+    """
+    Okapi BM25 over an inverted index (same scoring as rank_bm25.BM25Okapi).
+    add() appends one document in place, independent of corpus size; a query
+    only touches the postings of its own terms instead of every document.
+    Terms are interned to ids and postings kept as packed int32 arrays.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._vocab: Dict[str, int] = {}
+        self._post_docs: List[array] = []  # term id -> doc ids containing it
+        self._post_tfs: List[array] = []   # term id -> term frequency in each of those docs
+        self._doc_len = array("i")
+        self._total_len = 0
+        # Query-time views (length norm, idf, per-term arrays), rebuilt lazily after add()
+        self._stale = True
+        self._norm = np.zeros(0, dtype=np.float32)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, toks: List[str]):
+        doc_id = len(self._doc_len)
+        tf: Dict[str, int] = {}
+        for t in toks:
+            tf[t] = tf.get(t, 0) + 1
+        for t, n in tf.items():
+            tid = self._vocab.get(t)
+            if tid is None:
+                tid = self._vocab[t] = len(self._post_docs)
+                self._post_docs.append(array("i"))
+                self._post_tfs.append(array("i"))
+            self._post_docs[tid].append(doc_id)
+            self._post_tfs[tid].append(n)
+        self._doc_len.append(len(toks))
+        self._total_len += len(toks)
+        self._stale = True
+
+    def _refresh(self):
+        n_docs = len(self._doc_len)
+        avgdl = self._total_len / n_docs if n_docs else 0.0
+        doc_len = np.array(self._doc_len, dtype=np.float32)
+        # Per-document part of the BM25 denominator, independent of the query
+        self._norm = self.k1 * (1.0 - self.b + self.b * doc_len / max(avgdl, 1e-9))
+
+        df = np.fromiter((len(p) for p in self._post_docs), dtype=np.float64, count=len(self._post_docs))
+        idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+        floor = self.epsilon * float(idf.mean()) if idf.size else 0.0
+        self._idf = np.where(idf < 0, floor, idf)
+        self._arrays = {}
+        self._stale = False
+
+    def get_scores(self, query: List[str]) -> np.ndarray:
+        if self._stale:
+            self._refresh()
+        scores = np.zeros(len(self._doc_len), dtype=np.float32)
+        for t in query:
+            tid = self._vocab.get(t)
+            if tid is None:
+                continue
+            arr = self._arrays.get(tid)
+            if arr is None:
+                arr = self._arrays[tid] = (
+                    np.array(self._post_docs[tid], dtype=np.int32),
+                    np.array(self._post_tfs[tid], dtype=np.float32),
+                )
+            ids, tf = arr
+            scores[ids] += self._idf[tid] * tf * (self.k1 + 1.0) / (tf + self._norm[ids])
+        return scores
 
 
 class OllamaClient:
+    """embed()/embed_batch() return L2-normalized float32 vectors (cosine == dot)."""
+
     def __init__(self, base_url: str, embed_model: str, llm_model: str):
         self.base_url = (base_url or "http://127.0.0.1:11434").rstrip("/")
         self.embed_model = embed_model
         self.llm_model = llm_model
 
+        u = urlsplit(self.base_url)
+        self._conn_cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+        self._host = u.hostname or "127.0.0.1"
+        self._port = u.port
+        self._path_prefix = u.path.rstrip("/")
+        # One kept-alive connection per worker thread (calls run via asyncio.to_thread),
+        # instead of a new TCP connection per embed/generate
+        self._local = threading.local()
+        self._query_embs: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._sems: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+    def _limit(self, kind: str, n: int) -> asyncio.Semaphore:
+        # Created lazily per event loop: the Jetson agent runs several asyncio.run() loops
+        loop = asyncio.get_running_loop()
+        cur = self._sems.get(kind)
+        if cur is None or cur[0] is not loop:
+            cur = self._sems[kind] = (loop, asyncio.Semaphore(n))
+        return cur[1]
+
+    async def _call(self, kind: str, n: int, path: str, payload: Dict[str, Any], timeout_s: float) -> Dict[str, Any]:
+        async with self._limit(kind, n):
+            return await asyncio.to_thread(self._post_json, path, payload, timeout_s)
+
+    def _conn(self, timeout_s: float) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._conn_cls(self._host, self._port, timeout=timeout_s)
+            self._local.conn = conn
+        conn.timeout = timeout_s
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout_s)
+        return conn
+
+    def _drop_conn(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
     def _post_json(self, path: str, payload: Dict[str, Any], timeout_s: float) -> Dict[str, Any]:
+        data = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+        return self._request_json("POST", path, data, timeout_s)
+
+    def _request_json(self, method: str, path: str, data: Optional[bytes], timeout_s: float) -> Dict[str, Any]:
         url = f"{self.base_url}{path}"
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(
-            url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-            raw = resp.read().decode("utf-8", errors="ignore")
-            return json.loads(raw) if raw else {}
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in range(2):
+            conn = self._conn(timeout_s)
+            try:
+                conn.request(method, self._path_prefix + path, body=data, headers=headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                # Server closed the idle keep-alive socket: reconnect once
+                self._drop_conn()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._drop_conn()
+                raise
+            if resp.status >= 400:
+                raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            if not raw:
+                return {}
+            if orjson is not None:
+                try:
+                    return orjson.loads(raw)  # embedding vectors parse several times faster
+                except orjson.JSONDecodeError:
+                    pass
+            return json.loads(raw.decode("utf-8", errors="ignore"))
+        return {}
 
     async def embed(self, text: str, timeout_s: float = 30.0) -> np.ndarray:
         payload = {"model": self.embed_model, "prompt": text}
         try:
-            out = await asyncio.to_thread(self._post_json, "/api/embeddings", payload, timeout_s)
+            out = await self._call("embed", EMBED_CONCURRENCY, "/api/embeddings", payload, timeout_s)
         except Exception as e:
             raise RuntimeError(f"Ollama embeddings failed. Is Ollama running at {self.base_url}? ({e})")
 
         emb = out.get("embedding")
         if not isinstance(emb, list) or not emb:
             raise RuntimeError("Ollama embeddings returned no embedding vector.")
-        return np.array(emb, dtype=np.float32)
+        return _normalize(np.asarray(emb, dtype=np.float32))
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """embed() with an LRU in front: re-asked questions skip the Ollama round-trip."""
+        key = " ".join(_tokenize(text))
+        emb = self._query_embs.get(key)
+        if emb is not None:
+            self._query_embs.move_to_end(key)
+            return emb
+        emb = await self.embed(text)
+        if EMBED_CACHE_MAX > 0:
+            self._query_embs[key] = emb
+            while len(self._query_embs) > EMBED_CACHE_MAX:
+                self._query_embs.popitem(last=False)
+        return emb
+
+    async def embed_batch(self, texts: List[str], timeout_s: float = 120.0) -> np.ndarray:
+        payload = {"model": self.embed_model, "input": list(texts)}
+        try:
+            out = await self._call("embed", EMBED_CONCURRENCY, "/api/embed", payload, timeout_s)
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise RuntimeError(f"Ollama embeddings failed. Is Ollama running at {self.base_url}? ({e})")
+            out = {}
+        except Exception as e:
+            raise RuntimeError(f"Ollama embeddings failed. Is Ollama running at {self.base_url}? ({e})")
+
+        embs = out.get("embeddings")
+        if isinstance(embs, list) and len(embs) == len(texts) and all(embs):
+            out_embs = np.asarray(embs, dtype=np.float32)
+            return _normalize_rows(out_embs)
+
+        # Older Ollama builds only have /api/embeddings (one prompt per call)
+        return np.vstack(await asyncio.gather(*(self.embed(t, timeout_s=timeout_s) for t in texts)))  # unit rows already
 
     async def generate(self, prompt: str, system: str = "", timeout_s: float = 180.0) -> str:
         options: Dict[str, Any] = {
@@ -135,7 +446,7 @@ class OllamaClient:
         }
 
         try:
-            out = await asyncio.to_thread(self._post_json, "/api/generate", payload, timeout_s)
+            out = await self._call("generate", GENERATE_CONCURRENCY, "/api/generate", payload, timeout_s)
         except Exception as e:
             raise RuntimeError(f"Ollama generate failed. Is Ollama running at {self.base_url}? ({e})")
 
@@ -145,12 +456,15 @@ class OllamaClient:
         return txt.strip()
 
 
+_NO_HITS: Tuple[np.ndarray, np.ndarray] = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+
+
 class LightRAG:
     """
     Persistent store in working_dir:
       - meta.json         (rows: id/text/meta)
       - embeddings.npy    (float32 normalized)
-      - faiss.index       (IndexFlatIP over normalized vectors)
+      - faiss.index       (IndexFlatIP over normalized vectors; only when faiss is installed)
     """
 
     def __init__(
@@ -173,53 +487,128 @@ class LightRAG:
             llm_model=llm_model_name,
         )
 
-        self._rows: List[Dict[str, Any]] = _load_json(self.meta_path, default=[])
+        self._rows: List[Dict[str, Any]] = []
+        # _emb is a view of the first rows of _emb_buf, whose capacity doubles as
+        # inserts arrive, so appending doesn't copy the whole matrix every time
         self._emb: Optional[np.ndarray] = None
-        self._index: Optional[faiss.Index] = None
-
-        self._bm25: Optional[BM25Okapi] = None
-        self._bm25_tokens: List[List[str]] = []
-        self._inserts_since_bm25 = 0
+        self._emb_buf: Optional[np.ndarray] = None
+        self._index: Optional[Any] = None
+
+        self._bm25 = _BM25Index()
+
+        # cache_key -> (time, result, query embedding or None, "mode|top_k")
+        self._answers: "OrderedDict[str, Tuple[float, Dict[str, Any], Optional[np.ndarray], str]]" = OrderedDict()
+        # Bumped whenever _answers gains/loses entries; the stacked matrix of cached
+        # query embeddings used by _semantic_hit is rebuilt only when it changes.
+        self._answers_ver = 0
+        self._sem_mat: Tuple[int, List[str], Optional[np.ndarray]] = (-1, [], None)
+        # Embeddings of the store as it was before reset(), keyed by content hash,
+        # so a forced rebuild only embeds chunks that actually changed.
+        self._reuse: Dict[str, np.ndarray] = {}
+        # Set by reset()/inserts; flush() is a no-op while the files on disk are current
+        self._dirty = False
 
         self._load_store()
 
     def _load_store(self):
-        if os.path.exists(self.emb_path):
+        meta = _load_json(self.meta_path, default=[])
+        # meta.json is {"model", "dim", "rows"}; stores written before the header are a bare row list
+        if isinstance(meta, dict):
+            self._rows = meta.get("rows") or []
+            model, dim = meta.get("model"), meta.get("dim")
+        else:
+            self._rows = meta if isinstance(meta, list) else []
+            model, dim = None, None
+
+        # Vectors from another embedding model aren't comparable with new query embeddings
+        if os.path.exists(self.emb_path) and (model is None or model == self.client.embed_model):
             try:
-                self._emb = np.load(self.emb_path)
+                # Map instead of read: startup doesn't copy the matrix, and pages
+                # are faulted in by the first search/index build
+                self._emb = np.load(self.emb_path, mmap_mode="r")
             except Exception:
                 self._emb = None
 
-        if self._emb is not None and self._emb.ndim == 2 and self._emb.shape[0] == len(self._rows):
-            dim = int(self._emb.shape[1])
-            self._index = faiss.IndexFlatIP(dim)
-            self._index.add(self._emb.astype(np.float32))
+        if (
+            self._emb is not None
+            and self._emb.ndim == 2
+            and self._emb.shape[0] == len(self._rows)
+            and (dim is None or self._emb.shape[1] == dim)
+        ):
+            self._emb = np.ascontiguousarray(self._emb, dtype=np.float32)
+            self._index = self._build_index(self._emb)
         else:
+            # Rows without matching vectors (model/dim change, missing or short
+            # embeddings.npy) can't be kept: new embeddings would be appended at
+            # row 0 and vector hits would index the wrong chunks. Start empty.
+            if self._rows:
+                print(
+                    f"[RAG] {self.working_dir}: embeddings don't match meta.json "
+                    f"(model {model!r}, now {self.client.embed_model!r}); rebuild required"
+                )
+            self._rows = []
             self._emb = None
             self._index = None
 
-        self._bm25_tokens = [_tokenize(r.get("text", "")) for r in self._rows]
-        self._bm25 = BM25Okapi(self._bm25_tokens) if self._bm25_tokens else None
-        self._inserts_since_bm25 = 0
+        self._bm25 = _BM25Index()
+        for r in self._rows:
+            self._bm25.add(_tokenize(r.get("text", "")))
+
+    @staticmethod
+    def _new_index(dim: int) -> Optional[Any]:
+        if faiss is None:
+            return None
+        if VECTOR_INDEX == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            return index
+        return faiss.IndexFlatIP(dim)
+
+    @staticmethod
+    def _build_index(emb: np.ndarray) -> Optional[Any]:
+        """Index over a full embedding matrix (used on load and flush)."""
+        if faiss is None:
+            return None
+        dim = int(emb.shape[1])
+        if VECTOR_INDEX == "sq8" and emb.shape[0] >= SQ8_MIN_TRAIN:
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+            index.train(emb)
+        else:
+            index = LightRAG._new_index(dim)
+        index.add(emb)
+        return index
 
     def flush(self):
-        # Ensure BM25 is rebuilt before saving (so queries after restart are consistent)
-        if self._bm25_tokens:
-            self._bm25 = BM25Okapi(self._bm25_tokens)
-
-        _save_json(self.meta_path, self._rows)
+        if not self._dirty:
+            return
+        _save_json(self.meta_path, {
+            "model": self.client.embed_model,
+            "dim": int(self._emb.shape[1]) if self._emb is not None else None,
+            "rows": self._rows,
+        })
         if self._emb is not None:
-            np.save(self.emb_path, self._emb.astype(np.float32))
+            _save_npy(self.emb_path, self._emb)  # float32 by construction
+            if VECTOR_INDEX == "sq8" and faiss is not None and not isinstance(self._index, faiss.IndexScalarQuantizer):
+                # Store grew past the training threshold since load: retrain over everything
+                self._index = self._build_index(self._emb)
         if self._index is not None:
             faiss.write_index(self._index, self.index_path)
+        self._reuse = {}
+        self._dirty = False
 
     def reset(self):
+        if self._emb is not None and self._emb.shape[0] == len(self._rows):
+            for r, v in zip(self._rows, self._emb):
+                self._reuse[_content_key(r.get("text", ""))] = v
         self._rows = []
         self._emb = None
+        self._emb_buf = None
         self._index = None
-        self._bm25 = None
-        self._bm25_tokens = []
-        self._inserts_since_bm25 = 0
+        self._bm25 = _BM25Index()
+        self._answers.clear()
+        self._answers_ver += 1
+        self._dirty = True
         for p in [self.meta_path, self.emb_path, self.index_path]:
             try:
                 if os.path.exists(p):
@@ -233,57 +622,107 @@ class LightRAG:
             "vdb_path": self.working_dir,
         }
 
-    async def ainsert(self, text: str, meta: Optional[Dict[str, Any]] = None):
-        meta = meta or {}
-        emb = await self.client.embed(text)
-        emb = _normalize(emb)
-
-        _id = f"chunk_{_now_ms()}_{len(self._rows)}"
-        self._rows.append({"id": _id, "text": text, "meta": meta})
-
-        if self._emb is None:
-            self._emb = emb.reshape(1, -1)
-            dim = int(self._emb.shape[1])
-            self._index = faiss.IndexFlatIP(dim)
-            self._index.add(self._emb)
-        else:
-            self._emb = np.vstack([self._emb, emb.reshape(1, -1)])
-            assert self._index is not None
-            self._index.add(emb.reshape(1, -1))
-
-        # Incremental BM25 tokens (fast)
-        self._bm25_tokens.append(_tokenize(text))
-        self._inserts_since_bm25 += 1
-
-        # Rebuild BM25 occasionally (not every insert)
-        if self._inserts_since_bm25 >= BM25_REBUILD_EVERY:
-            self._bm25 = BM25Okapi(self._bm25_tokens) if self._bm25_tokens else None
-            self._inserts_since_bm25 = 0
-
-    def _search_vector(self, q_emb: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
-        if self._index is None or self._emb is None or len(self._rows) == 0:
-            return []
-        q_emb = _normalize(q_emb).reshape(1, -1)
-        scores, idxs = self._index.search(q_emb, max(1, int(top_k)))
-        out: List[Tuple[int, float]] = []
-        for i, s in zip(idxs[0], scores[0]):
-            if i < 0:
-                continue
-            out.append((int(i), float(s)))  # cosine sim
-        return out
+    def _append(self, texts: List[str], metas: List[Dict[str, Any]], embs: np.ndarray):
+        self._answers.clear()
+        self._answers_ver += 1
+        self._dirty = True
+        ts = _now_ms()
+        for text, meta in zip(texts, metas):
+            _id = f"chunk_{ts}_{len(self._rows)}"
+            self._rows.append({"id": _id, "text": text, "meta": meta})
+
+        n = 0 if self._emb is None else self._emb.shape[0]
+        end = n + embs.shape[0]
+        if self._emb_buf is None or end > self._emb_buf.shape[0]:
+            buf = np.empty((max(16, end, 2 * n), embs.shape[1]), dtype=np.float32)
+            if n:
+                buf[:n] = self._emb
+            self._emb_buf = buf
+        self._emb_buf[n:end] = embs
+        self._emb = self._emb_buf[:end]
+        if n == 0:
+            self._index = self._new_index(int(embs.shape[1]))
+        if self._index is not None:
+            self._index.add(embs)
 
-    def _search_bm25(self, query: str, top_k: int) -> List[Tuple[int, float]]:
-        if len(self._rows) == 0:
-            return []
-        if self._bm25 is None:
-            self._bm25 = BM25Okapi(self._bm25_tokens) if self._bm25_tokens else None
-        if self._bm25 is None:
-            return []
+        for t in texts:
+            self._bm25.add(_tokenize(t))
+
+    async def ainsert(self, text: str, meta: Optional[Dict[str, Any]] = None):
+        emb = self._reuse.get(_content_key(text))
+        if emb is None:
+            emb = await self.client.embed(text)
+        self._append([text], [meta or {}], emb.reshape(1, -1))
+
+    async def ainsert_many(self, texts: List[str], metas: Optional[List[Optional[Dict[str, Any]]]] = None):
+        """Insert many chunks, embedding EMBED_BATCH texts per Ollama request."""
+        if not texts:
+            return
+        if metas is None:
+            metas = [None] * len(texts)
+        vecs: List[Optional[np.ndarray]] = [self._reuse.get(_content_key(t)) for t in texts]
+        # Similar-length texts per request, so the server pads each batch as little as possible
+        missing = sorted((i for i, v in enumerate(vecs) if v is None), key=lambda i: len(texts[i]))
+
+        async def run(ids: List[int]):
+            fresh = await self.client.embed_batch([texts[i] for i in ids])
+            for i, v in zip(ids, fresh):
+                vecs[i] = v
+
+        # Sub-batches are queued together; OllamaClient caps how many are in flight
+        await asyncio.gather(*(run(missing[s:s + EMBED_BATCH]) for s in range(0, len(missing), EMBED_BATCH)))
+        self._append(list(texts), [m or {} for m in metas], np.vstack(vecs))
+
+    # Searches return (row ids, scores) as aligned arrays, best first
+    def _search_vector(self, q_emb: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self._emb is None or len(self._rows) == 0:
+            return _NO_HITS
+        top_k = max(1, int(top_k))
+        if self._index is None:
+            # Rows and query are L2-normalized, so cosine is one SGEMV over the contiguous matrix
+            if simsimd is not None:
+                scores = 1.0 - np.asarray(simsimd.cdist(q_emb.reshape(1, -1), self._emb, metric="cosine")).reshape(-1)
+            else:
+                scores = self._emb @ q_emb
+            k = min(top_k, scores.shape[0])
+            idx = np.argpartition(-scores, k - 1)[:k]
+            idx = idx[np.argsort(-scores[idx])]
+            return idx, scores[idx]
+        scores, idxs = self._index.search(q_emb.reshape(1, -1), top_k)
+        keep = idxs[0] >= 0  # faiss pads with -1 when the store has fewer than top_k rows
+        return idxs[0][keep].astype(np.int64), scores[0][keep]  # cosine sim
+
+    def _search_bm25(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(self._bm25) == 0:
+            return _NO_HITS
 
         toks = _tokenize(query)
         scores = self._bm25.get_scores(toks)
-        idxs = np.argsort(-scores)[: max(1, int(top_k))]
-        return [(int(i), float(scores[i])) for i in idxs]
+        k = min(max(1, int(top_k)), scores.shape[0])
+        idxs = np.argpartition(-scores, k - 1)[:k]
+        idxs = idxs[np.argsort(-scores[idxs])]
+        return idxs, scores[idxs]
+
+    def _semantic_hit(self, q_emb: np.ndarray, scope: str) -> Optional[Dict[str, Any]]:
+        if SEMANTIC_CACHE_THRESH <= 0:
+            return None
+        if self._sem_mat[0] != self._answers_ver:
+            keys = [k for k, v in self._answers.items() if v[2] is not None]
+            mat = np.vstack([self._answers[k][2] for k in keys]) if keys else None
+            self._sem_mat = (self._answers_ver, keys, mat)
+        _, keys, mat = self._sem_mat
+        if mat is None:
+            return None
+
+        sims = mat @ q_emb
+        close = np.flatnonzero(sims >= SEMANTIC_CACHE_THRESH)
+        now = time.time()
+        for i in close[np.argsort(-sims[close])]:
+            ts, result, _, s = self._answers[keys[i]]
+            if s == scope and now - ts < QUERY_CACHE_TTL_S:
+                self._answers.move_to_end(keys[i])
+                return dict(result)
+        return None
 
     async def aquery(self, query: str, param: Optional[QueryParam] = None) -> Dict[str, Any]:
         param = param or QueryParam()
@@ -293,55 +732,74 @@ class LightRAG:
         mode = (param.mode or "hybrid").lower()
         top_k = max(1, int(param.top_k))
 
-        candidates: Dict[int, Dict[str, float]] = {}
+        cache_key = hashlib.sha256(f"{mode}|{top_k}|{' '.join(_tokenize(query))}".encode("utf-8")).hexdigest()
+        cached = self._answers.get(cache_key)
+        if cached is not None:
+            if time.time() - cached[0] < QUERY_CACHE_TTL_S:
+                self._answers.move_to_end(cache_key)
+                return dict(cached[1])
+            self._answers.pop(cache_key, None)
+            self._answers_ver += 1
+
+        scope = f"{mode}|{top_k}"
+        q_emb: Optional[np.ndarray] = None
+        vec_ids, vec_scores = _NO_HITS
+        bm_ids, bm_scores = _NO_HITS
 
         if mode in ("vector", "hybrid"):
-            q_emb = await self.client.embed(query)
-            for idx, score in self._search_vector(q_emb, top_k=top_k * 2):
-                candidates.setdefault(idx, {})
-                candidates[idx]["vec"] = score
+            q_emb = await self.client.embed_query(query)
+            hit = self._semantic_hit(q_emb, scope)
+            if hit is not None:
+                return hit
+            vec_ids, vec_scores = self._search_vector(q_emb, top_k=top_k * 2)
 
         if mode in ("bm25", "hybrid"):
-            for idx, score in self._search_bm25(query, top_k=top_k * 2):
-                candidates.setdefault(idx, {})
-                candidates[idx]["bm25"] = score
-
-        scored: List[Tuple[float, int]] = []
-        for idx, d in candidates.items():
-            vec = d.get("vec", 0.0)
-            bm = d.get("bm25", 0.0)
-            bm_norm = bm / (abs(bm) + 8.0)
-            total = (0.75 * vec) + (0.25 * bm_norm) if mode == "hybrid" else (vec if mode == "vector" else bm_norm)
-            scored.append((float(total), int(idx)))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        top = scored[:top_k]
+            bm_ids, bm_scores = self._search_bm25(query, top_k=top_k * 2)
+
+        # Fuse on the union of candidates; a row missing from one list scores 0 there
+        cand = np.union1d(vec_ids, bm_ids)
+        vec = np.zeros(cand.shape[0], dtype=np.float32)
+        vec[np.searchsorted(cand, vec_ids)] = vec_scores
+        bm = np.zeros(cand.shape[0], dtype=np.float32)
+        bm[np.searchsorted(cand, bm_ids)] = bm_scores
+        bm_norm = bm / (np.abs(bm) + 8.0)
+        total = (0.75 * vec) + (0.25 * bm_norm) if mode == "hybrid" else (vec if mode == "vector" else bm_norm)
+        order = np.argsort(-total, kind="stable")
+        scored = zip(total[order].tolist(), cand[order].tolist())
 
         hits = []
-        sources = []
-        ctx_parts = []
+        sources: Dict[str, None] = {}
+        ctx_parts: Dict[str, None] = {}  # insertion-ordered set: best-scored copy of each text wins
 
-        for score, idx in top:
+        for score, idx in scored:
+            if len(ctx_parts) >= top_k:
+                break
             r = self._rows[idx]
-            hits.append({"score": score, "text": r.get("text", ""), "meta": r.get("meta", {})})
-            ctx_parts.append(r.get("text", ""))
+            text = r.get("text", "")
+            if text in ctx_parts:
+                continue
+            ctx_parts[text] = None
+            hits.append({"score": score, "text": text, "meta": r.get("meta", {})})
 
             src = (r.get("meta") or {}).get("source")
-            if isinstance(src, str) and src and src not in sources:
-                sources.append(src)
-
-        context = "\n\n---\n\n".join(ctx_parts)
-        if len(context) > MAX_CTX_CHARS:
-            context = context[:MAX_CTX_CHARS] + "\n\n[...context truncated...]"
-
-        system = (
-            "You are AURA. Answer ONLY using the provided context. "
-            "If the context doesn't contain the answer, say you don't have enough information."
-        )
-        prompt = f"CONTEXT:\n{context}\n\nQUESTION:\n{query}\n\nANSWER:"
-        answer = await self.client.generate(prompt=prompt, system=system, timeout_s=AURA_OLLAMA_TIMEOUT_S)
-
-        return {"answer": answer, "sources": sources, "hits": hits}
+            if isinstance(src, str) and src:
+                sources[src] = None
+
+        budget = AURA_NUM_CTX - AURA_NUM_PREDICT - CTX_RESERVED_TOKENS - _prompt_fixed_tokens() - _count_tokens(query)
+        context = _pack_context(list(ctx_parts), budget)
+        if MAX_CTX_CHARS > 0 and len(context) > MAX_CTX_CHARS:
+            context = context[:MAX_CTX_CHARS] + _CTX_TRUNCATED
+
+        prompt = "".join((_PROMPT_HEAD, context, _PROMPT_MID, query, _PROMPT_TAIL))
+        answer = await self.client.generate(prompt=prompt, system=_SYSTEM_PROMPT, timeout_s=AURA_OLLAMA_TIMEOUT_S)
+
+        result = {"answer": answer, "sources": list(sources), "hits": hits}
+        if QUERY_CACHE_MAX > 0:
+            self._answers[cache_key] = (time.time(), result, q_emb, scope)
+            while len(self._answers) > QUERY_CACHE_MAX:
+                self._answers.popitem(last=False)
+            self._answers_ver += 1
+        return dict(result)
     
     
 
@@ -349,11 +807,11 @@ class LightRAG:
         return getattr(self.client, "base_url", "")
 
     def is_ollama_reachable(self) -> bool:
-        # quick ping: Ollama exposes GET /api/tags
+        # quick ping: Ollama exposes GET /api/tags (over the client's kept-alive connection)
         try:
-            import urllib.request
-            url = f"{self.client.base_url}/api/tags"
-            with urllib.request.urlopen(url, timeout=2.5) as resp:
-                return 200 <= int(getattr(resp, "status", 200)) < 500
+            self.client._request_json("GET", "/api/tags", None, 2.5)
+            return True
+        except urllib.error.HTTPError as e:
+            return e.code < 500
         except Exception:
             return False
\ No newline at end of file
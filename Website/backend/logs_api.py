@@ -1,8 +1,14 @@
 import os
 import json
+import gzip
 import time
+import queue
+import atexit
+import threading
+from bisect import bisect_right
+from collections import deque
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Deque, Tuple, Callable
 
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel
@@ -10,6 +16,11 @@ from dotenv import load_dotenv
 
 from security import require_auth
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 load_dotenv(Path(__file__).resolve().parents[1] / ".env")
 
 router = APIRouter(prefix="/logs", tags=["logs"])
@@ -23,6 +34,26 @@ STORAGE_DIR.mkdir(parents=True, exist_ok=True)
 
 LOG_INGEST_SECRET = os.getenv("LOG_INGEST_SECRET", "")
 
+# Once the live log reaches this size it is renamed to a timestamped segment
+# and gzipped in the background; the listing window falls back to the newest
+# segments when the live file alone is too short. 0 disables rotation.
+LOG_ROTATE_BYTES = int(os.getenv("AURA_LOG_ROTATE_MB", "32")) << 20
+LOG_GZIP_DELAY = 5.0  # seconds other workers get to notice the rename
+
+# Listing reads the log backwards in blocks of this size, so cost follows the
+# page size rather than the file size
+TAIL_CHUNK = 1 << 16
+
+# /logs/list and /logs/mine look at this many newest entries. They are kept parsed
+# in memory and topped up from the file's new bytes on each request, so entries
+# appended by other workers still show up without re-parsing the window.
+# Each is stored with its lowercased filter keys and search text, computed once.
+LIST_SCAN = 5000
+_RING: Deque["_Entry"] = deque(maxlen=LIST_SCAN)
+_RING_POS = -1  # file offset the ring is synced to (-1 = not loaded yet)
+_RING_INO = 0
+_RING_LOCK = threading.Lock()
+
 print(f"[LOGS] STORAGE_DIR = {STORAGE_DIR}")
 print(f"[LOGS] LOG_FILE = {LOG_FILE}")
 
@@ -34,34 +65,325 @@ def require_admin(request: Request) -> Dict[str, Any]:
     return payload
 
 
-def _append_log(obj: Dict[str, Any]) -> None:
-    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+# One unbuffered append handle, owned by the writer thread below
+_LOG_FH = None
+_LOG_FH_LOCK = threading.Lock()
 
+# /write and /ingest only enqueue the encoded line; a daemon thread drains the
+# queue and appends up to LOG_BATCH lines with a single write(). When the queue
+# is full the request writes its own line instead of dropping it.
+LOG_QUEUE_MAX = int(os.getenv("AURA_LOG_QUEUE_MAX", "10000"))
+LOG_BATCH = 256
+_LOG_Q: "queue.Queue[Tuple[int, bytes]]" = queue.Queue(maxsize=LOG_QUEUE_MAX)
+_LOG_WRITER: Optional[threading.Thread] = None
 
-def _read_logs(limit: int, offset: int) -> List[Dict[str, Any]]:
-    if not LOG_FILE.exists():
-        return []
+# Queued lines carry a sequence number; readers wait until the writer has
+# flushed up to the last number handed out when they started, not for the
+# queue to go idle (which under steady traffic may never happen)
+_SEQ_COND = threading.Condition()
+_ENQ_SEQ = 0
+_DONE_SEQ = 0
+LOG_READ_WAIT = 2.0
 
-    with open(LOG_FILE, "r", encoding="utf-8") as f:
-        lines = f.readlines()
 
-    lines.reverse()  # newest first
+def _dump_line(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass  # e.g. non-str meta keys or >64-bit ints; stdlib json copes
+    # Same compact form as orjson, so search text doesn't depend on which ran
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _is_live(fh) -> bool:
+    try:
+        return os.fstat(fh.fileno()).st_ino == LOG_FILE.stat().st_ino
+    except OSError:
+        return False
+
+
+def _write_lines(data: bytes) -> None:
+    global _LOG_FH
+    with _LOG_FH_LOCK:
+        if _LOG_FH is None or not _is_live(_LOG_FH):
+            if _LOG_FH is not None:
+                _LOG_FH.close()  # log was removed or rotated away
+            STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+            _LOG_FH = open(LOG_FILE, "ab", buffering=0)  # whole lines per write()
+        _LOG_FH.write(data)
+        if LOG_ROTATE_BYTES and _LOG_FH.tell() >= LOG_ROTATE_BYTES:
+            _rotate()
+
+
+def _rotate() -> None:
+    """Called with _LOG_FH_LOCK held, right after a write that crossed the limit."""
+    global _LOG_FH
+    seg = LOG_FILE.with_name(f"{LOG_FILE.stem}.{time.time_ns():020d}.{os.getpid()}.jsonl")
+    try:
+        os.rename(LOG_FILE, seg)
+    except OSError as e:
+        print(f"[LOGS] rotate failed: {e}")
+        return
+    _LOG_FH.close()
+    _LOG_FH = None
+    threading.Thread(target=_compress_segment, args=(seg,), daemon=True).start()
+
+
+def _compress_segment(seg: Path) -> None:
+    time.sleep(LOG_GZIP_DELAY)
+    gz = seg.with_name(seg.name + ".gz")
+    tmp = seg.with_name(seg.name + ".gz.tmp")
+    try:
+        with open(seg, "rb") as src, gzip.open(tmp, "wb", compresslevel=9) as dst:
+            while True:
+                block = src.read(1 << 20)
+                if not block:
+                    break
+                dst.write(block)
+        os.replace(tmp, gz)
+        seg.unlink()
+    except Exception as e:
+        print(f"[LOGS] compress failed for {seg.name}: {e}")
+
+
+def _segments() -> List[Path]:
+    """Rotated log segments, newest first."""
+    # While a segment is being compressed both x.jsonl and x.jsonl.gz exist
+    # (between os.replace and unlink); list it once, as the finished .gz
+    by_stem: Dict[str, Path] = {}
+    for p in STORAGE_DIR.glob(f"{LOG_FILE.stem}.*.jsonl*"):
+        name = p.name
+        if name.endswith(".tmp"):
+            continue
+        stem = name[:-3] if name.endswith(".gz") else name
+        if stem not in by_stem or name.endswith(".gz"):
+            by_stem[stem] = p
+    return [by_stem[k] for k in sorted(by_stem, reverse=True)]
 
-    start = max(0, offset)
-    end = max(0, offset + limit)
 
-    out: List[Dict[str, Any]] = []
-    for line in lines[start:end]:
-        line = line.strip()
-        if not line:
-            continue
+def _segment_lines(seg: Path, needed: int) -> Iterator[bytes]:
+    """Like _tail_lines, for a rotated segment that may have been gzipped meanwhile."""
+    if not seg.name.endswith(".gz"):
         try:
-            out.append(json.loads(line))
-        except Exception:
-            continue
-    return out
+            yield from _tail_lines(seg, needed)
+            return
+        except FileNotFoundError:
+            seg = seg.with_name(seg.name + ".gz")
+    try:
+        with gzip.open(seg, "rb") as f:
+            last = deque((line.strip() for line in f if line.strip()), maxlen=needed)
+    except (OSError, EOFError):
+        return
+    yield from reversed(last)
+
+
+def _drain(first: Tuple[int, bytes]) -> None:
+    global _DONE_SEQ
+    batch = [first]
+    while len(batch) < LOG_BATCH:
+        try:
+            batch.append(_LOG_Q.get_nowait())
+        except queue.Empty:
+            break
+    try:
+        _write_lines(b"".join(line for _, line in batch))
+    except Exception as e:
+        print(f"[LOGS] write failed, {len(batch)} entries lost: {e}")
+    finally:
+        for _ in batch:
+            _LOG_Q.task_done()
+        with _SEQ_COND:
+            _DONE_SEQ = batch[-1][0]
+            _SEQ_COND.notify_all()
+
+
+def _wait_for_writer() -> None:
+    """Block until every line queued before this call is on disk (bounded)."""
+    with _SEQ_COND:
+        target = _ENQ_SEQ
+        _SEQ_COND.wait_for(lambda: _DONE_SEQ >= target, timeout=LOG_READ_WAIT)
+
+
+def _writer_loop() -> None:
+    while True:
+        _drain(_LOG_Q.get())
+
+
+def _flush_pending() -> None:
+    """Write out whatever is still queued at interpreter exit."""
+    while True:
+        try:
+            first = _LOG_Q.get_nowait()
+        except queue.Empty:
+            return
+        _drain(first)
+
+
+atexit.register(_flush_pending)
+
+
+def _append_log(obj: Dict[str, Any]) -> None:
+    global _LOG_WRITER, _ENQ_SEQ
+    line = _dump_line(obj)
+    if _LOG_WRITER is None:
+        with _LOG_FH_LOCK:
+            if _LOG_WRITER is None:
+                _LOG_WRITER = threading.Thread(target=_writer_loop, name="aura-log-writer", daemon=True)
+                _LOG_WRITER.start()
+    with _SEQ_COND:
+        try:
+            _LOG_Q.put_nowait((_ENQ_SEQ + 1, line))
+            _ENQ_SEQ += 1
+            return
+        except queue.Full:
+            pass
+    _write_lines(line)
+
+
+def _tail_lines(path: Path, needed: int, end: Optional[int] = None) -> Iterator[bytes]:
+    """Yield up to `needed` non-empty lines of `path` before byte `end`, newest first."""
+    if needed <= 0:
+        return
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        rest = b""
+        while pos > 0:
+            step = min(TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines.pop(0)  # possibly cut mid-line; completed by the next block
+            for line in reversed(lines):
+                line = line.strip()
+                if line:
+                    yield line
+                    needed -= 1
+                    if needed <= 0:
+                        return
+        rest = rest.strip()
+        if rest:
+            yield rest
+
+
+# (entry, email, role, event, search blob) -- all lowercased
+_Entry = Tuple[Dict[str, Any], str, str, str, str]
+
+
+def _parse_line(line: bytes) -> Optional[_Entry]:
+    try:
+        obj = orjson.loads(line) if orjson is not None else json.loads(line)
+    except Exception:
+        return None
+    if not isinstance(obj, dict):
+        return None
+    email = str(obj.get("user_email", "")).strip().lower()
+    role = str(obj.get("user_role", "")).lower()
+    event = str(obj.get("event", "")).lower()
+    blob = " ".join(
+        [
+            str(obj.get("user_email", "")),
+            str(obj.get("user_role", "")),
+            str(obj.get("event", "")),
+            str(obj.get("prompt", "")),
+            str(obj.get("response_preview", "")),
+            _dump_line(obj.get("meta", {})).decode("utf-8"),
+        ]
+    ).lower()
+    return obj, email, role, event, blob
+
+
+def _recent_logs() -> List[_Entry]:
+    """The newest LIST_SCAN log entries, newest first."""
+    global _RING_POS, _RING_INO
+    if _LOG_WRITER is not None:
+        _wait_for_writer()  # so a reader sees its own just-queued entries
+    with _RING_LOCK:
+        try:
+            st = LOG_FILE.stat()
+            size, ino = st.st_size, st.st_ino
+        except FileNotFoundError:
+            size, ino = 0, 0
+
+        if _RING_POS < 0 or size < _RING_POS or ino != _RING_INO:
+            # First call, or the log was truncated/replaced: reload from the tail
+            _RING.clear()
+            if size:
+                for line in _tail_lines(LOG_FILE, LIST_SCAN, end=size):
+                    ent = _parse_line(line)
+                    if ent is not None:
+                        _RING.appendleft(ent)
+            for seg in _segments():
+                if len(_RING) >= LIST_SCAN:
+                    break
+                for line in _segment_lines(seg, LIST_SCAN - len(_RING)):
+                    ent = _parse_line(line)
+                    if ent is not None:
+                        _RING.appendleft(ent)
+            _RING_POS, _RING_INO = size, ino
+        elif size > _RING_POS:
+            with open(LOG_FILE, "rb") as f:
+                f.seek(_RING_POS)
+                data = f.read(size - _RING_POS)
+            cut = data.rfind(b"\n") + 1  # a half-written last line waits for the next call
+            for line in data[:cut].split(b"\n"):
+                ent = _parse_line(line.strip()) if line.strip() else None
+                if ent is not None:
+                    _RING.append(ent)
+            _RING_POS += cut
+
+        return list(reversed(_RING))
+
+
+def _page(entries: List[_Entry], pred: Callable[[_Entry], bool], offset: int, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """One pass: count every match, but only keep the ones on the requested page."""
+    page: List[Dict[str, Any]] = []
+    total = 0
+    end = offset + limit
+    for ent in entries:
+        if pred(ent):
+            if offset <= total < end:
+                page.append(ent[0])
+            total += 1
+    return page, total
+
+
+# Search text of the whole window joined into one string, so /logs/list?q= is a
+# handful of str.find() calls instead of a substring test per entry. Rebuilt
+# only when the window has changed since the last search.
+_SEP = "\x1e"
+_SEARCH_LOCK = threading.Lock()
+_SEARCH: Tuple[Optional[_Entry], Optional[_Entry], int, str, List[int]] = (None, None, 0, "", [])
+
+
+def _search_hits(entries: List[_Entry], q_l: str) -> List[_Entry]:
+    """Entries whose search text contains `q_l`, in the same order."""
+    global _SEARCH
+    if not entries:
+        return []
+    if _SEP in q_l:
+        return [ent for ent in entries if q_l in ent[4]]
+
+    with _SEARCH_LOCK:
+        first, last, n, big, starts = _SEARCH
+        if first is not entries[0] or last is not entries[-1] or n != len(entries):
+            starts = []
+            pos = 0
+            for ent in entries:
+                starts.append(pos)
+                pos += len(ent[4]) + 1
+            big = _SEP.join([ent[4] for ent in entries])
+            _SEARCH = (entries[0], entries[-1], len(entries), big, starts)
+
+    hits: List[_Entry] = []
+    pos = big.find(q_l)
+    while pos >= 0:
+        i = bisect_right(starts, pos) - 1
+        hits.append(entries[i])
+        if i + 1 >= len(starts):
+            break
+        pos = big.find(q_l, starts[i + 1])  # one hit per entry is enough
+    return hits
 
 
 class LogWrite(BaseModel):
@@ -145,19 +467,17 @@ def my_logs(request: Request, limit: int = 200, offset: int = 0):
     Any authed user can read THEIR OWN logs only.
     """
     payload = require_auth(request)
-    me = (payload.get("sub") or "").strip().lower()
+    me = payload["sub"]  # require_auth already normalized it
 
     limit = max(1, min(limit, 1000))
     offset = max(0, offset)
 
-    items = _read_logs(limit=5000, offset=0)
-    mine = [it for it in items if str(it.get("user_email", "")).strip().lower() == me]
-    page = mine[offset : offset + limit]
+    page, total = _page(_recent_logs(), lambda ent: ent[1] == me, offset, limit)
 
     return {
         "ok": True,
         "email": me,
-        "total": len(mine),
+        "total": total,
         "limit": limit,
         "offset": offset,
         "items": page,
@@ -178,39 +498,24 @@ def list_logs(
     limit = max(1, min(limit, 1000))
     offset = max(0, offset)
 
-    items = _read_logs(limit=5000, offset=0)
+    items = _recent_logs()
 
     q_l = (q or "").strip().lower()
     role_l = (role or "").strip().lower()
     event_l = (event or "").strip().lower()
 
-    def matches(it: Dict[str, Any]) -> bool:
-        if event_l and str(it.get("event", "")).lower() != event_l:
+    def matches(ent: _Entry) -> bool:
+        if event_l and ent[3] != event_l:
             return False
-        if role_l and str(it.get("user_role", "")).lower() != role_l:
-            return False
-        if q_l:
-            blob = " ".join(
-                [
-                    str(it.get("user_email", "")),
-                    str(it.get("user_role", "")),
-                    str(it.get("event", "")),
-                    str(it.get("prompt", "")),
-                    str(it.get("response_preview", "")),
-                    json.dumps(it.get("meta", {}), ensure_ascii=False),
-                ]
-            ).lower()
-            if q_l not in blob:
-                return False
-        return True
-
-    filtered = [it for it in items if matches(it)]
-    page = filtered[offset : offset + limit]
+        return not role_l or ent[2] == role_l
+
+    candidates = _search_hits(items, q_l) if q_l else items
+    page, matched = _page(candidates, matches, offset, limit)
 
     return {
         "ok": True,
         "total_scanned": len(items),
-        "total_matched": len(filtered),
+        "total_matched": matched,
         "limit": limit,
         "offset": offset,
         "items": page,
@@ -1,9 +1,10 @@
 # backend/main.py
 import os
+import json
 import importlib
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import ensure_storage_layout
@@ -42,14 +43,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Probed constantly by the load balancer: the body never changes, so it is
+# encoded once and the handler is async (no threadpool hop, no serialization)
+_HEALTH_BODY = json.dumps({"ok": True, "env": ENV}, separators=(",", ":")).encode("utf-8")
+_HEALTH_HEADERS = {"Cache-Control": "max-age=1"}
+
 @app.get("/health")
-def health():
-    return {"ok": True, "env": ENV}
+async def health():
+    return Response(content=_HEALTH_BODY, media_type="application/json", headers=_HEALTH_HEADERS)
 
 def include_router_safely(module_name: str, label: str):
     """
     Imports a module and includes its `router` if present.
     Never blocks app startup if a router fails to import.
+    In prod a router module that is simply not deployed is skipped quietly.
     """
     try:
         mod = importlib.import_module(module_name)
@@ -58,36 +65,38 @@ def include_router_safely(module_name: str, label: str):
             raise RuntimeError(f"{module_name} has no attribute 'router'")
         app.include_router(router)
         print(f"✅ Loaded router: {label} ({module_name})")
+    except ModuleNotFoundError as e:
+        if e.name == module_name and ENV in ("prod", "production"):
+            return
+        print(f"⚠️ Router not loaded ({label} / {module_name}): {e}")
     except Exception as e:
         print(f"⚠️ Router not loaded ({label} / {module_name}): {e}")
 
-def m(name: str) -> str:
-    if os.getenv("AURA_USE_BACKEND_PACKAGE", "0") == "1":
-        return f"backend.{name}"
-    return name
-
-include_router_safely(m("auth_me_api"), "auth_me_api")
-include_router_safely(m("admin_auth_api"), "admin_auth_api")
-include_router_safely(m("student_auth_api"), "student_auth_api")
-include_router_safely(m("ta_auth_api"), "ta_auth_api")
-include_router_safely(m("ta_admin_api"), "ta_admin_api")
-include_router_safely(m("database_api"), "database_api")
-include_router_safely(m("logs_api"), "logs_api")
-include_router_safely(m("device_api"), "device_api")
-include_router_safely(m("device_commands_api"), "device_commands_api")
-include_router_safely(m("camera_bridge_api"), "camera_bridge_api")
-
-if os.getenv("ENABLE_CAMERA", "0") == "1":
-    include_router_safely(m("camera_api"), "camera_api")
-
-if os.getenv("ENABLE_DETECT", "0") == "1":
-    include_router_safely(m("detect_api"), "detect_api")
-
-if os.getenv("ENABLE_TTS", "0") == "1":
-    include_router_safely(m("tts_api"), "tts_api")
-
-if os.getenv("ENABLE_STT", "0") == "1":
-    include_router_safely(m("stt_api"), "stt_api")
+ROUTERS = (
+    "auth_me_api",
+    "admin_auth_api",
+    "student_auth_api",
+    "ta_auth_api",
+    "ta_admin_api",
+    "database_api",
+    "logs_api",
+    "device_api",
+    "device_commands_api",
+    "camera_bridge_api",
+)
+
+# Loaded only when their env flag is "1"
+OPTIONAL_ROUTERS = (
+    ("ENABLE_CAMERA", "camera_api"),
+    ("ENABLE_DETECT", "detect_api"),
+    ("ENABLE_TTS", "tts_api"),
+    ("ENABLE_STT", "stt_api"),
+)
+
+MODULE_PREFIX = "backend." if os.getenv("AURA_USE_BACKEND_PACKAGE", "0") == "1" else ""
+
+for name in ROUTERS + tuple(n for flag, n in OPTIONAL_ROUTERS if os.getenv(flag, "0") == "1"):
+    include_router_safely(MODULE_PREFIX + name, name)
 
 @app.on_event("startup")
 async def _startup():
@@ -2,15 +2,26 @@
 import os
 import json
 import time
+import hmac
 import hashlib
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 
 def hash_code(code: str) -> str:
     return hashlib.sha256((code or "").strip().encode("utf-8")).hexdigest()
 
 
+def code_matches(code: str, otp_hash: Any) -> bool:
+    """Constant-time check of a submitted code against a stored hash_code()."""
+    return isinstance(otp_hash, str) and hmac.compare_digest(hash_code(code), otp_hash)
+
+
 class OTPStore:
     """
     File-backed OTP store keyed by:
@@ -35,21 +46,25 @@ class OTPStore:
     def _read(self) -> Dict[str, Any]:
         self._ensure_file()
         try:
-            raw = self.path.read_text(encoding="utf-8").strip()
-            if not raw:
+            raw = self.path.read_bytes()
+            if not raw.strip():
                 return {}
-            data = json.loads(raw)
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             return data if isinstance(data, dict) else {}
         except Exception:
             return {}
 
     def _write(self, data: Dict[str, Any]) -> None:
         tmp = self.path.with_suffix(".json.tmp")
-        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        if orjson is not None:
+            tmp.write_bytes(orjson.dumps(data))
+        else:
+            tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
         tmp.replace(self.path)
 
     def _key(self, email: str) -> str:
-        return (email or "").strip().lower()
+        # Callers pass security.norm_email() output; only guard against None here
+        return email or ""
 
     def set(self, email: str, code: str, ttl_seconds: int = 300) -> None:
         email_key = self._key(email)
@@ -103,6 +118,42 @@ class OTPStore:
         self._write(data)
         return int(rec["attempts"])
 
+    def verify_attempt(self, email: str, code: str, max_attempts: int) -> str:
+        """
+        Whole OTP check in one read and at most one write: counts the attempt,
+        drops the record once it is used up, expired or matched.
+        Returns "ok", "invalid" or "too_many".
+        """
+        email_key = self._key(email)
+        if not email_key:
+            return "invalid"
+
+        data = self._read()
+        rec = data.get(email_key)
+        if not isinstance(rec, dict):
+            return "invalid"
+
+        expires = int(rec.get("expires", 0) or 0)
+        if expires and time.time() > expires:
+            data.pop(email_key, None)
+            self._write(data)
+            return "invalid"
+
+        attempts = int(rec.get("attempts", 0)) + 1
+        if attempts > max_attempts:
+            data.pop(email_key, None)
+            self._write(data)
+            return "too_many"
+
+        if code_matches(code, rec.get("otp_hash")):
+            data.pop(email_key, None)
+            self._write(data)
+            return "ok"
+
+        rec["attempts"] = attempts
+        self._write(data)
+        return "invalid"
+
     def delete(self, email: str) -> None:
         email_key = self._key(email)
         if not email_key:
@@ -1,7 +1,9 @@
 # backend/security.py
 import os
 import json
-from typing import Dict, Any
+import ipaddress
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple, FrozenSet
 from fastapi import Request, HTTPException
 
 from config import ALLOWED_IPS, API_TOKEN, AUTH_ALLOWED_DOMAINS, ADMIN_USERS_PATH
@@ -9,21 +11,61 @@ from security_tokens import verify_token
 from ta_store import is_ta
 
 
+# ---------------------------
+# Email normalization
+# ---------------------------
+def norm_email(email: Optional[str]) -> str:
+    """Stripped + lowercased; input that is already normalized comes back as-is."""
+    email = (email or "").strip()
+    return email if email.islower() else email.lower()
+
+
 # ---------------------------
 # Client IP (Azure-friendly)
 # ---------------------------
 def get_client_ip(request: Request) -> str:
+    # Parsed once per request: the allowlist check and rate limiting both ask
+    ip = getattr(request.state, "client_ip", None)
+    if ip is not None:
+        return ip
     xff = request.headers.get("x-forwarded-for", "")
     if xff:
-        return xff.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
+        end = xff.find(",")  # first hop is the client; no list of all hops
+        ip = (xff if end < 0 else xff[:end]).strip()
+    else:
+        ip = request.client.host if request.client else "unknown"
+    request.state.client_ip = ip
+    return ip
+
+
+# ALLOWED_IPS entries are exact addresses or CIDR ranges ("10.0.0.0/8")
+_ALLOWED_IPS = frozenset(ip for ip in ALLOWED_IPS if "/" not in ip)
+_ALLOWED_NETS = []
+for _cidr in ALLOWED_IPS:
+    if "/" in _cidr:
+        try:
+            _ALLOWED_NETS.append(ipaddress.ip_network(_cidr, strict=False))
+        except ValueError:
+            print(f"[SECURITY] ignoring bad ALLOWED_IPS range: {_cidr}")
+
+
+@lru_cache(maxsize=4096)
+def _ip_allowed(ip: str) -> bool:
+    if ip in _ALLOWED_IPS:
+        return True
+    if not _ALLOWED_NETS:
+        return False
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(addr in net for net in _ALLOWED_NETS)
 
 
 def require_ip_allowlist(request: Request):
     if not ALLOWED_IPS:
         return
-    ip = get_client_ip(request)
-    if ip not in ALLOWED_IPS:
+    if not _ip_allowed(get_client_ip(request)):
         raise HTTPException(status_code=403, detail="IP not allowed")
 
 
@@ -61,34 +103,49 @@ def _get_auth_token_from_request(request: Request) -> str:
     return ""
 
 
-def _load_admin_emails() -> set[str]:
-    try:
-        if not ADMIN_USERS_PATH.exists():
-            return set()
+# Admin emails parsed from admin_users.json, keyed by the file's (mtime_ns,
+# inode, size): require_auth resolves the role on every request, but the file
+# is only re-read after an admin is added or removed
+_ADMIN_EMAILS: Tuple[Tuple[int, int, int], FrozenSet[str]] = ((-1, -1, -1), frozenset())
 
+
+def _read_admin_emails() -> FrozenSet[str]:
+    try:
         raw = ADMIN_USERS_PATH.read_text(encoding="utf-8").strip()
         if not raw:
-            return set()
+            return frozenset()
 
         data = json.loads(raw)
         admins = data.get("admins", [])
         if not isinstance(admins, list):
-            return set()
+            return frozenset()
 
         out: set[str] = set()
         for item in admins:
             if not isinstance(item, dict):
                 continue
-            email = (item.get("email") or "").strip().lower()
+            email = norm_email(item.get("email"))
             if email:
                 out.add(email)
-        return out
+        return frozenset(out)
     except Exception:
-        return set()
+        return frozenset()
+
+
+def _load_admin_emails() -> FrozenSet[str]:
+    global _ADMIN_EMAILS
+    try:
+        st = ADMIN_USERS_PATH.stat()
+    except OSError:
+        return frozenset()
+    key = (st.st_mtime_ns, st.st_ino, st.st_size)
+    if key != _ADMIN_EMAILS[0]:
+        _ADMIN_EMAILS = (key, _read_admin_emails())
+    return _ADMIN_EMAILS[1]
 
 
 def resolve_current_role(email: str) -> str:
-    email = (email or "").strip().lower()
+    email = norm_email(email)
     if not email or "@" not in email:
         return "student"
 
@@ -114,7 +171,7 @@ def require_auth(request: Request) -> Dict[str, Any]:
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    email = (payload.get("sub") or "").strip().lower()
+    email = norm_email(payload.get("sub"))
     if not email:
         raise HTTPException(status_code=401, detail="Invalid token")
 
@@ -137,14 +194,11 @@ def require_role(request: Request, *allowed_roles: str) -> Dict[str, Any]:
 # ---------------------------
 # Email domain restriction
 # ---------------------------
-def domain_allowed(email: str) -> bool:
-    email = (email or "").strip().lower()
-    if "@" not in email:
-        return False
+# config already strips/lowercases each entry
+_ALLOWED_DOMAINS = frozenset(AUTH_ALLOWED_DOMAINS or ()) or frozenset({"tamu.edu"})
 
-    domain = email.split("@", 1)[1].strip().lower()
-    allowed = set((AUTH_ALLOWED_DOMAINS or []))
-    if not allowed:
-        allowed = {"tamu.edu"}
 
-    return domain in allowed
\ No newline at end of file
+def domain_allowed(email: str) -> bool:
+    """Expects a norm_email()'d address; every auth router normalizes first."""
+    _, at, domain = email.partition("@")
+    return bool(at) and domain in _ALLOWED_DOMAINS
\ No newline at end of file
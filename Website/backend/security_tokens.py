@@ -3,14 +3,32 @@ import os
 import time
 import json
 import base64
-import hmac
 import hashlib
+import hmac
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 AUTH_SECRET = os.getenv("AUTH_SECRET", "")
+_AUTH_SECRET_BYTES = AUTH_SECRET.encode("utf-8")
 AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL_SECONDS", "3600"))
 
+# sha256(token) of tokens whose signature already checked out -> (exp, parsed
+# payload), so the cache holds no bearer tokens. Expiry and revocation are
+# still evaluated on every verify_token() call; expired entries are dropped.
+VERIFIED_CACHE_MAX = 4096
+_VERIFIED: Dict[bytes, Tuple[int, Dict[str, Any]]] = {}
+_VERIFIED_LOCK = threading.Lock()
+
+# Parsed token_revocations.json, keyed by the file's (mtime_ns, inode, size) so
+# it is only re-read after revoke_user_tokens() (from any worker) replaces it
+_REVOCATIONS: Tuple[Tuple[int, int, int], Dict[str, int]] = ((-1, -1, -1), {})
+
 
 def _b64url_encode(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
@@ -78,11 +96,23 @@ def revoke_user_tokens(email: str) -> int:
     return now
 
 
+def _cached_revocations() -> Dict[str, int]:
+    global _REVOCATIONS
+    try:
+        st = _revocations_path().stat()
+        key = (st.st_mtime_ns, st.st_ino, st.st_size)
+    except FileNotFoundError:
+        key = (0, 0, 0)
+    if key != _REVOCATIONS[0]:
+        _REVOCATIONS = (key, _read_revocations())
+    return _REVOCATIONS[1]
+
+
 def get_user_revoked_after(email: str) -> int:
     email = (email or "").strip().lower()
     if not email:
         return 0
-    data = _read_revocations()
+    data = _cached_revocations()
     return int(data.get(email, 0) or 0)
 
 
@@ -90,8 +120,11 @@ def sign_token(payload: Dict[str, Any]) -> str:
     if not AUTH_SECRET:
         raise RuntimeError("AUTH_SECRET missing")
 
-    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
-    sig = hmac.new(AUTH_SECRET.encode("utf-8"), raw, hashlib.sha256).digest()
+    if orjson is not None:
+        raw = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    else:
+        raw = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    sig = hmac.digest(_AUTH_SECRET_BYTES, raw, "sha256")
     return f"{_b64url_encode(raw)}.{_b64url_encode(sig)}"
 
 
@@ -102,29 +135,39 @@ def verify_token(token: str) -> Dict[str, Any]:
     if not token or "." not in token:
         raise ValueError("Malformed token")
 
-    raw_b64, sig_b64 = token.split(".", 1)
-    raw = _b64url_decode(raw_b64)
-    sig = _b64url_decode(sig_b64)
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    hit = _VERIFIED.get(key)
+    if hit is not None:
+        exp, payload = hit
+    else:
+        raw_b64, sig_b64 = token.split(".", 1)
+        raw = _b64url_decode(raw_b64)
+        sig = _b64url_decode(sig_b64)
+
+        expected = hmac.digest(_AUTH_SECRET_BYTES, raw, "sha256")
+        if not hmac.compare_digest(sig, expected):
+            raise ValueError("Invalid token signature")
+
+        payload = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+        exp = int(payload.get("exp", 0) or 0)
+        with _VERIFIED_LOCK:
+            if len(_VERIFIED) >= VERIFIED_CACHE_MAX:
+                _VERIFIED.pop(next(iter(_VERIFIED)), None)
+            _VERIFIED[key] = (exp, payload)
 
-    expected = hmac.new(AUTH_SECRET.encode("utf-8"), raw, hashlib.sha256).digest()
-    if not hmac.compare_digest(sig, expected):
-        raise ValueError("Invalid token signature")
-
-    payload = json.loads(raw.decode("utf-8"))
-
-    exp = int(payload.get("exp", 0) or 0)
     now = int(time.time())
     if exp and now >= exp:
+        with _VERIFIED_LOCK:
+            _VERIFIED.pop(key, None)
         raise ValueError("Token expired")
 
-    email = (payload.get("sub") or "").strip().lower()
+    # sub was normalized by mint_app_token and the signature proves it unchanged
     iat = int(payload.get("iat", 0) or 0)
-
-    revoked_after = get_user_revoked_after(email)
+    revoked_after = int(_cached_revocations().get(payload.get("sub") or "", 0) or 0)
     if revoked_after and iat < revoked_after:
         raise ValueError("Token revoked")
 
-    return payload
+    return dict(payload)  # callers overwrite sub/role on their copy
 
 
 def mint_app_token(email: str, role: str) -> Dict[str, Any]:
@@ -0,0 +1,95 @@
+# backend/smtp_sender.py
+import smtplib
+import threading
+from email.message import EmailMessage
+from typing import List
+
+
+class SmtpSender:
+    """
+    Small pool of STARTTLS + LOGIN'd SMTP connections, reused for every
+    message instead of paying the TLS handshake and AUTH per OTP email.
+    Up to pool_size idle connections are kept; concurrent sends beyond that
+    open a temporary one.
+
+    send() is blocking; handlers run it via BackgroundTasks (deliver) or
+    asyncio.to_thread.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        timeout_s: float = 20.0,
+        pool_size: int = 4,
+    ):
+        self.host = host
+        self.port = int(port)
+        self.user = user
+        self.password = password
+        self.timeout_s = timeout_s
+        self.pool_size = pool_size
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def configured(self) -> bool:
+        return bool(self.host and self.user and self.password)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout_s)
+        try:
+            server.starttls()
+            server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    @staticmethod
+    def _drop(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(server)
+                return
+        self._drop(server)
+
+    def send(self, msg: EmailMessage) -> None:
+        server, reused = self._checkout()
+        try:
+            server.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+            # Server dropped the idle connection: reconnect once
+            self._drop(server)
+            if not reused:
+                raise
+            server = self._connect()
+            try:
+                server.send_message(msg)
+            except Exception:
+                self._drop(server)
+                raise
+        except Exception:
+            self._drop(server)
+            raise
+        self._checkin(server)
+
+    def deliver(self, msg: EmailMessage) -> None:
+        """send() for background tasks: the response is already out, so log failures."""
+        try:
+            self.send(msg)
+        except Exception as e:
+            print(f"[SMTP] failed to send to {msg['To']}: {e}")
@@ -1,5 +1,7 @@
 # backend/stt_api.py
 import os
+import shutil
+import asyncio
 import tempfile
 from pathlib import Path
 from typing import Optional
@@ -24,6 +26,12 @@ STT_LANGUAGE = os.getenv("STT_LANGUAGE", "en")  # blank = auto detect
 
 _whisper_model = None
 
+def _copy_to_file(src, dst_path: str) -> int:
+    src.seek(0)
+    with open(dst_path, "wb") as w:
+        shutil.copyfileobj(src, w, 1 << 20)
+        return w.tell()
+
 def _get_model():
     global _whisper_model
     if _whisper_model is not None:
@@ -50,15 +58,14 @@ async def transcribe(request: Request, file: UploadFile = File(...)):
     require_ip_allowlist(request)
     require_auth(request)
 
-    data = await file.read()
-    if not data:
-        raise HTTPException(status_code=400, detail="Empty upload")
-
-    # Save to temp file; faster-whisper expects a filename
+    # Copy to a temp file in chunks (faster-whisper expects a filename)
     suffix = Path(file.filename or "").suffix or ".webm"
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(data)
         tmp_path = tmp.name
+    size = await asyncio.to_thread(_copy_to_file, file.file, tmp_path)
+    if not size:
+        os.remove(tmp_path)
+        raise HTTPException(status_code=400, detail="Empty upload")
 
     try:
         model = _get_model()
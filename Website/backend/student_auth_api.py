@@ -1,19 +1,18 @@
 # backend/student_auth_api.py
 import os
-import time
 import random
-import smtplib
 from email.message import EmailMessage
 from pathlib import Path
 from typing import Dict, Any
 
-from fastapi import APIRouter, Request, HTTPException, Response
+from fastapi import APIRouter, BackgroundTasks, Request, HTTPException, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from security import require_ip_allowlist, domain_allowed, resolve_current_role
+from security import require_ip_allowlist, domain_allowed, resolve_current_role, norm_email
 from security_tokens import mint_app_token
-from otp_store import OTPStore, hash_code
+from otp_store import OTPStore
+from smtp_sender import SmtpSender
 
 # Local dev only
 env_path = Path(__file__).resolve().parents[1] / ".env"
@@ -26,13 +25,16 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASS = os.getenv("SMTP_PASS", "")
 SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER)
+mailer = SmtpSender(SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS)
 
 STUDENT_OTP_TTL_SECONDS = int(os.getenv("STUDENT_OTP_TTL_SECONDS", "300"))
 STUDENT_MAX_OTP_ATTEMPTS = int(os.getenv("STUDENT_MAX_OTP_ATTEMPTS", "6"))
 
 COOKIE_NAME = os.getenv("AUTH_COOKIE_NAME", "aura_token")
 COOKIE_SAMESITE = os.getenv("AUTH_COOKIE_SAMESITE", "lax")
-COOKIE_DOMAIN = os.getenv("AUTH_COOKIE_DOMAIN", "")
+COOKIE_DOMAIN = os.getenv("AUTH_COOKIE_DOMAIN", "").strip()
+_COOKIE_KWARGS: Dict[str, Any] = {"domain": COOKIE_DOMAIN} if COOKIE_DOMAIN else {}
+_ENV_IS_PROD = (os.getenv("ENV", "") or "").lower() in ("prod", "production")
 
 router = APIRouter(prefix="/auth/student", tags=["student-auth"])
 otp_store = OTPStore(prefix="studentotp")
@@ -48,14 +50,11 @@ class StudentVerifyReq(BaseModel):
 
 
 def _should_secure_cookie(request: Request) -> bool:
-    env = (os.getenv("ENV", "") or "").lower()
-    if env in ("prod", "production"):
-        return True
-    return request.url.scheme == "https"
+    return _ENV_IS_PROD or request.url.scheme == "https"
 
 
-def _send_otp_email(to_email: str, code: str):
-    if not SMTP_HOST or not SMTP_USER or not SMTP_PASS:
+def _send_otp_email(background_tasks: BackgroundTasks, to_email: str, code: str):
+    if not mailer.configured():
         raise HTTPException(status_code=500, detail="SMTP not configured")
 
     msg = EmailMessage()
@@ -68,10 +67,8 @@ def _send_otp_email(to_email: str, code: str):
         f"If you did not request this, ignore this email."
     )
 
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
+    # Delivered after the response goes out; the SMTP round-trips don't gate it
+    background_tasks.add_task(mailer.deliver, msg)
 
 
 def _portal_hints(email: str) -> Dict[str, Any]:
@@ -94,10 +91,10 @@ def _portal_hints(email: str) -> Dict[str, Any]:
 
 
 @router.post("/start")
-async def start(data: StudentStartReq, request: Request):
+async def start(data: StudentStartReq, request: Request, background_tasks: BackgroundTasks):
     require_ip_allowlist(request)
 
-    email = (data.email or "").strip().lower()
+    email = norm_email(data.email)
     if not email or "@" not in email:
         raise HTTPException(status_code=400, detail="Enter your TAMU email")
 
@@ -106,7 +103,7 @@ async def start(data: StudentStartReq, request: Request):
 
     code = f"{random.randint(100000, 999999)}"
     otp_store.set(email=email, code=code, ttl_seconds=STUDENT_OTP_TTL_SECONDS)
-    _send_otp_email(email, code)
+    _send_otp_email(background_tasks, email, code)
 
     return {
         "message": "OTP sent",
@@ -119,7 +116,7 @@ async def start(data: StudentStartReq, request: Request):
 async def verify(data: StudentVerifyReq, request: Request, response: Response):
     require_ip_allowlist(request)
 
-    email = (data.email or "").strip().lower()
+    email = norm_email(data.email)
     otp = (data.otp or "").strip()
 
     if not email or "@" not in email:
@@ -128,32 +125,16 @@ async def verify(data: StudentVerifyReq, request: Request, response: Response):
     if not domain_allowed(email):
         raise HTTPException(status_code=403, detail="Only @tamu.edu emails are allowed")
 
-    rec = otp_store.get(email)
-    if not rec:
-        raise HTTPException(status_code=401, detail="Invalid code")
-
-    if int(rec.get("expires", 0) or 0) and time.time() > int(rec["expires"]):
-        otp_store.delete(email)
-        raise HTTPException(status_code=401, detail="Invalid code")
-
-    attempts = otp_store.incr_attempts(email)
-    if attempts > STUDENT_MAX_OTP_ATTEMPTS:
-        otp_store.delete(email)
+    outcome = otp_store.verify_attempt(email, otp, STUDENT_MAX_OTP_ATTEMPTS)
+    if outcome == "too_many":
         raise HTTPException(status_code=429, detail="Too many attempts")
-
-    if hash_code(otp) != rec.get("otp_hash"):
+    if outcome != "ok":
         raise HTTPException(status_code=401, detail="Invalid code")
 
-    otp_store.delete(email)
-
     result = mint_app_token(email=email, role="student")
     token = result["token"]
 
     secure_cookie = _should_secure_cookie(request)
-    cookie_kwargs: Dict[str, Any] = {}
-    if COOKIE_DOMAIN.strip():
-        cookie_kwargs["domain"] = COOKIE_DOMAIN.strip()
-
     response.set_cookie(
         key=COOKIE_NAME,
         value=token,
@@ -161,7 +142,7 @@ async def verify(data: StudentVerifyReq, request: Request, response: Response):
         secure=secure_cookie,
         samesite=COOKIE_SAMESITE,
         max_age=result["expires_in"],
-        **cookie_kwargs,
+        **_COOKIE_KWARGS,
     )
 
     return {
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel
 
-from security import require_ip_allowlist, require_role
+from security import require_ip_allowlist, require_role, norm_email
 from security_tokens import revoke_user_tokens
 from ta_store import list_ta_items, add_ta, remove_ta
 
@@ -18,8 +18,10 @@ def _require_admin(request: Request):
     return require_role(request, "admin")
 
 
+# Served from ta_store's in-memory cache, so it stays on the event loop; add and
+# remove fsync the file and stay sync (threadpool)
 @router.get("/list")
-def ta_list(request: Request):
+async def ta_list(request: Request):
     _require_admin(request)
     return {"items": list_ta_items()}
 
@@ -28,12 +30,11 @@ def ta_list(request: Request):
 def ta_add(req: TaReq, request: Request):
     payload = _require_admin(request)
 
-    email = (req.email or "").strip().lower()
+    email = norm_email(req.email)
     if not email or "@" not in email:
         raise HTTPException(status_code=400, detail="Invalid email")
 
-    admin_email = (payload.get("sub") or "").strip().lower()
-    add_ta(email, added_by=admin_email)
+    add_ta(email, added_by=payload["sub"])
 
     # Option B:
     # do NOT revoke on promotion/add, so existing user session can stay alive
@@ -44,7 +45,7 @@ def ta_add(req: TaReq, request: Request):
 def ta_remove(req: TaReq, request: Request):
     _require_admin(request)
 
-    email = (req.email or "").strip().lower()
+    email = norm_email(req.email)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid email")
 
@@ -1,8 +1,14 @@
 import os
 import json
 import time
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, FrozenSet
+
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 def _default_path() -> Path:
     # Prefer Azure persistent storage if configured
@@ -23,31 +29,75 @@ def _init_if_missing_or_empty() -> None:
     - If empty (size 0) -> write {"tas":[]}
     """
     if (not TA_USERS_PATH.exists()) or (TA_USERS_PATH.stat().st_size == 0):
-        TA_USERS_PATH.write_text(json.dumps({"tas": []}, indent=2) + "\n", encoding="utf-8")
+        _write({"tas": []})
 
 def _read() -> Dict[str, Any]:
     _init_if_missing_or_empty()
     try:
-        return json.loads(TA_USERS_PATH.read_text(encoding="utf-8"))
+        raw = TA_USERS_PATH.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("TA store must be a JSON object")
+        return data
     except Exception:
         # If corrupted, reset safely (you can also choose to raise)
-        TA_USERS_PATH.write_text(json.dumps({"tas": []}, indent=2) + "\n", encoding="utf-8")
+        _write({"tas": []})
         return {"tas": []}
 
 def _write(data: Dict[str, Any]) -> None:
-    TA_USERS_PATH.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+    # temp file + fsync + rename: a crash mid-write never truncates the TA list
+    tmp = TA_USERS_PATH.with_suffix(f".{os.getpid()}.tmp")  # per worker
+    if orjson is not None:
+        body = orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    else:
+        body = (json.dumps(data, separators=(",", ":")) + "\n").encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, TA_USERS_PATH)
 
 def _norm(email: str) -> str:
-    return (email or "").strip().lower()
+    email = (email or "").strip()
+    return email if email.islower() else email.lower()
+
+# Normalized TA list plus its email set, keyed by the file's (mtime_ns, inode,
+# size) so it is only re-read after add_ta()/remove_ta() (from any worker)
+# rewrites the file
+_LOCK = threading.RLock()
+_CACHE: Tuple[Tuple[int, int, int], List[Dict[str, Any]], FrozenSet[str]] = (
+    (-1, -1, -1), [], frozenset()
+)
+
+def _stat_key() -> Tuple[int, int, int]:
+    try:
+        st = TA_USERS_PATH.stat()
+    except FileNotFoundError:
+        return (0, 0, 0)
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+def _load_if_stale() -> Tuple[Tuple[int, int, int], List[Dict[str, Any]], FrozenSet[str]]:
+    global _CACHE
+    key = _stat_key()
+    if key == _CACHE[0]:
+        return _CACHE
+    with _LOCK:
+        key = _stat_key()
+        if key != _CACHE[0]:
+            raw = _read()
+            items = _normalize(raw)
+            if raw.get("tas") != items:
+                _write({"tas": items})  # persist migration + cleanup, once
+                key = _stat_key()
+            _CACHE = (key, items, frozenset(x["email"] for x in items))
+        return _CACHE
+
+def _store(items: List[Dict[str, Any]]) -> None:
+    global _CACHE
+    _write({"tas": items})
+    _CACHE = (_stat_key(), items, frozenset(x["email"] for x in items))
 
-def list_ta_items() -> List[Dict[str, Any]]:
-    """
-    Returns:
-      [{"email": "...", "added_by": "...", "added_ts": 123}, ...]
-    Auto-migrates old format:
-      {"tas": ["a@tamu.edu", ...]}
-    """
-    raw = _read()
+def _normalize(raw: Dict[str, Any]) -> List[Dict[str, Any]]:
     tas = raw.get("tas", [])
     if not isinstance(tas, list):
         tas = []
@@ -81,36 +131,49 @@ def list_ta_items() -> List[Dict[str, Any]]:
         )
 
     out.sort(key=lambda x: x["email"])
-    _write({"tas": out})  # persist migration + cleanup
     return out
 
+def list_ta_items() -> List[Dict[str, Any]]:
+    """
+    Returns:
+      [{"email": "...", "added_by": "...", "added_ts": 123}, ...]
+    Auto-migrates old format:
+      {"tas": ["a@tamu.edu", ...]}
+    """
+    return [dict(x) for x in _load_if_stale()[1]]
+
 def list_tas() -> List[str]:
-    return [x["email"] for x in list_ta_items()]
+    return [x["email"] for x in _load_if_stale()[1]]
 
 def is_ta(email: str) -> bool:
-    e = _norm(email)
-    return e in set(list_tas())
+    return _norm(email) in _load_if_stale()[2]
 
 def add_ta(email: str, added_by: str = "") -> None:
     email = _norm(email)
     if not email or "@" not in email:
         return
 
-    items = list_ta_items()
-    if any(x["email"] == email for x in items):
-        return
+    with _LOCK:
+        _, items, emails = _load_if_stale()
+        if email in emails:
+            return
 
-    items.append(
-        {
-            "email": email,
-            "added_by": _norm(added_by),
-            "added_ts": int(time.time()),
-        }
-    )
-    items.sort(key=lambda x: x["email"])
-    _write({"tas": items})
+        items = list(items)
+        items.append(
+            {
+                "email": email,
+                "added_by": _norm(added_by),
+                "added_ts": int(time.time()),
+            }
+        )
+        items.sort(key=lambda x: x["email"])
+        _store(items)
 
 def remove_ta(email: str) -> None:
     email = _norm(email)
-    items = [x for x in list_ta_items() if x["email"] != email]
-    _write({"tas": items})
\ No newline at end of file
+    with _LOCK:
+        _, items, emails = _load_if_stale()
+        if email not in emails:
+            return
+        kept = [x for x in items if x["email"] != email]
+        _store(kept)
\ No newline at end of file
@@ -1,5 +1,6 @@
 # backend/tts_api.py
 import os
+import queue
 import threading
 from pathlib import Path
 from typing import Optional
@@ -20,42 +21,84 @@ router = APIRouter(tags=["tts"])
 TTS_RATE = int(os.getenv("TTS_RATE", "165"))
 TTS_VOLUME = float(os.getenv("TTS_VOLUME", "1.0"))
 TTS_VOICE_ID = os.getenv("TTS_VOICE_ID", "").strip()  # optional
+TTS_QUEUE_MAX = int(os.getenv("TTS_QUEUE_MAX", "32"))
 
 _lock = threading.Lock()
 
+# One engine per process: pyttsx3.init() starts the OS speech driver, which is
+# far too slow to repeat per request. Guarded by _lock like every engine call.
+_ENGINE = None
+
+# Requests are spoken in order by one worker thread; a full queue answers 429
+_TTS_Q: "queue.Queue[tuple]" = queue.Queue(maxsize=TTS_QUEUE_MAX)
+_TTS_WORKER: Optional[threading.Thread] = None
+_WORKER_LOCK = threading.Lock()
+
 class SpeakReq(BaseModel):
     text: str
     interrupt: bool = True  # if True, stop current speech before speaking
 
-def _speak_pyttsx3(text: str, interrupt: bool):
+def _get_engine():
+    global _ENGINE
+    if _ENGINE is not None:
+        return _ENGINE
+
     import pyttsx3
 
+    engine = pyttsx3.init()
+
+    # apply config once; it never changes after import
+    try:
+        engine.setProperty("rate", TTS_RATE)
+        engine.setProperty("volume", TTS_VOLUME)
+    except Exception:
+        pass
+
+    # optional voice selection
+    if TTS_VOICE_ID:
+        try:
+            voices = engine.getProperty("voices")
+            for v in voices:
+                if v.id == TTS_VOICE_ID or getattr(v, "name", "") == TTS_VOICE_ID:
+                    engine.setProperty("voice", v.id)
+                    break
+        except Exception:
+            pass
+
+    _ENGINE = engine
+    return engine
+
+def _speak_pyttsx3(text: str, interrupt: bool):
+    global _ENGINE
+
     # pyttsx3 is not fully thread-safe globally; we serialize access
     with _lock:
-        engine = pyttsx3.init()
+        engine = _get_engine()
+        if interrupt:
+            engine.stop()
+        try:
+            engine.say(text)
+            engine.runAndWait()
+        except Exception:
+            # a wedged driver gets rebuilt on the next request
+            _ENGINE = None
+            raise
 
-        # apply config
+def _tts_loop():
+    while True:
+        text, interrupt = _TTS_Q.get()
         try:
-            engine.setProperty("rate", TTS_RATE)
-            engine.setProperty("volume", TTS_VOLUME)
+            _speak_pyttsx3(text, interrupt)
         except Exception:
             pass
 
-        # optional voice selection
-        if TTS_VOICE_ID:
-            try:
-                voices = engine.getProperty("voices")
-                for v in voices:
-                    if v.id == TTS_VOICE_ID or getattr(v, "name", "") == TTS_VOICE_ID:
-                        engine.setProperty("voice", v.id)
-                        break
-            except Exception:
-                pass
-
-        # interrupt just means we don't queue; pyttsx3 engine is fresh anyway
-        engine.say(text)
-        engine.runAndWait()
-        engine.stop()
+def _ensure_worker():
+    global _TTS_WORKER
+    if _TTS_WORKER is None:
+        with _WORKER_LOCK:
+            if _TTS_WORKER is None:
+                _TTS_WORKER = threading.Thread(target=_tts_loop, name="aura-tts", daemon=True)
+                _TTS_WORKER.start()
 
 @router.post("/api/tts/speak")
 async def speak(request: Request, body: SpeakReq):
@@ -66,12 +109,18 @@ async def speak(request: Request, body: SpeakReq):
     if not text:
         raise HTTPException(status_code=400, detail="No text")
 
-    # Run in background thread so request returns fast
-    def worker():
+    _ensure_worker()
+    if body.interrupt:
+        # drop whatever is still waiting; the new text replaces it
         try:
-            _speak_pyttsx3(text, body.interrupt)
-        except Exception:
+            while True:
+                _TTS_Q.get_nowait()
+        except queue.Empty:
             pass
 
-    threading.Thread(target=worker, daemon=True).start()
+    # Queued for the worker thread so the request returns fast
+    try:
+        _TTS_Q.put_nowait((text, body.interrupt))
+    except queue.Full:
+        raise HTTPException(status_code=429, detail="TTS busy")
     return {"ok": True}
\ No newline at end of file